@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Export Signed Agreements script (index.py)
+
+Runs offline against synthetic data, no API key needed.
+
+Benchmarks:
+- classifier: single-pass timeline extraction (build_timeline) versus the
+  original six extract_* scans, on large synthetic audit trails
+- timestamps: batch date formatting (unix_ms_to_utc_strings) versus one
+  datetime.strftime() call per value
+- e2e: complete exports against the local mock server (mock_server.py), one
+  run per execution mode, reporting agreements per second, p95 request
+  latency, peak memory and TCP connections accepted by the server
+
+Usage:
+    python benchmark.py classifier --activities 5000 --agreements 200
+    python benchmark.py timestamps --count 200000
+    python benchmark.py e2e --agreements 2000 --latency-ms 30 --rate-limit-errors 0.01
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+import index
+import mock_server
+
+
+# Activity names used in synthetic audit trails, most of them noise (views, comments, ...)
+NOISE_ACTIVITIES = ["VIEW", "COMMENT", "DOCUMENT_UPDATE", "MEMBER_INVITE"]
+TIMELINE_ACTIVITIES = ["VALIDATION_ACCEPT", "NEGOTIATION_APPROVE", "AGREEMENT_SIGNATURE_FINALIZE"]
+
+
+def synthetic_activities(rng, count, relevant_ratio=0.05):
+    """
+    Generate a synthetic audit trail in the shape returned by the API.
+
+    Args:
+        rng: random.Random instance
+        count: Number of activities
+        relevant_ratio: Share of approval/signature activities
+
+    Returns:
+        Response dict with "activities" key, in random (unsorted) order
+    """
+    base = 1700000000000 + rng.randint(0, 10 ** 10)
+    activities = []
+    for _ in range(count):
+        if rng.random() < relevant_ratio:
+            name = rng.choice(TIMELINE_ACTIVITIES)
+        else:
+            name = rng.choice(NOISE_ACTIVITIES)
+        activities.append({
+            "name": name,
+            # Coarse timestamps so ties occur and ordering stability is exercised
+            "createdAt": base + rng.randint(0, 10 ** 6) * 1000,
+            "creator": {"actor": {"email": f"user{rng.randint(0, 50)}@example.com"}},
+        })
+    return {"activities": activities}
+
+
+# Original per-field extraction of index.py, replaced by classify_activities()
+# and kept as the reference implementation for legacy_timeline()
+
+def extract_creation_date(activities_response):
+    """
+    Extract creation date from earliest activity in audit trail.
+
+    The creation date is the timestamp of the first (earliest) activity,
+    NOT from the agreements list API (which is not always accurate).
+
+    Args:
+        activities_response: Response dict with "activities" key
+
+    Returns:
+        UTC datetime string of earliest activity, or empty string if no activities
+    """
+    activities = activities_response.get("activities", [])
+
+    if not activities:
+        return ""
+
+    # Find earliest timestamp across ALL activities
+    earliest_timestamp = min(activity.get("createdAt", float('inf')) for activity in activities)
+
+    if earliest_timestamp == float('inf'):
+        return ""
+
+    return index.unix_ms_to_utc_string(earliest_timestamp)
+
+
+def extract_created_by(activities_response):
+    """
+    Extract the email of the user who created the agreement from the earliest activity.
+
+    Args:
+        activities_response: Response dict with "activities" key
+
+    Returns:
+        User email address, or empty string if cannot determine
+    """
+    activities = activities_response.get("activities", [])
+
+    if not activities:
+        return ""
+
+    # Find earliest activity
+    earliest_activity = min(activities, key=lambda a: a.get("createdAt", float('inf')))
+
+    # Extract user email from creator.actor structure
+    creator = earliest_activity.get("creator", {})
+    actor = creator.get("actor", {})
+
+    return actor.get("email", "")
+
+
+def extract_approval_dates(activities_response):
+    """
+    Extract first and last approval dates from audit trail.
+
+    Filters for VALIDATION_ACCEPT activity type (workflow approvals).
+
+    Args:
+        activities_response: Response dict with "activities" key
+
+    Returns:
+        Tuple of (first_approval_utc, last_approval_utc) as strings
+        Returns ("", "") if no approval activities found
+    """
+    activities = activities_response.get("activities", [])
+
+    # Filter for approval activities (VALIDATION_ACCEPT)
+    approval_activities = [
+        activity for activity in activities
+        if activity.get("name") == "VALIDATION_ACCEPT"
+    ]
+
+    if not approval_activities:
+        return ("", "")
+
+    # Get timestamps
+    timestamps = [activity.get("createdAt") for activity in approval_activities if activity.get("createdAt")]
+
+    if not timestamps:
+        return ("", "")
+
+    # Sort to find first and last
+    timestamps.sort()
+    first_utc = index.unix_ms_to_utc_string(timestamps[0])
+    last_utc = index.unix_ms_to_utc_string(timestamps[-1])
+
+    return (first_utc, last_utc)
+
+
+def extract_detailed_approvals(activities_response, max_approvers=5):
+    """
+    Extract up to max_approvers approval details (email + date) from audit trail.
+
+    Filters for VALIDATION_ACCEPT activity type (workflow approvals).
+
+    Args:
+        activities_response: Response dict with "activities" key
+        max_approvers: Maximum number of approvers to return (default: 5)
+
+    Returns:
+        Tuple of (approvals_list, total_count)
+        - approvals_list: List of dicts with 'email' and 'date' (up to max_approvers)
+        - total_count: Total number of approvals (including those beyond max_approvers)
+    """
+    activities = activities_response.get("activities", [])
+
+    # Filter for approval activities (VALIDATION_ACCEPT)
+    approval_activities = [
+        activity for activity in activities
+        if activity.get("name") == "VALIDATION_ACCEPT"
+    ]
+
+    if not approval_activities:
+        return ([], 0)
+
+    # Sort by timestamp (earliest first)
+    approval_activities.sort(key=lambda a: a.get("createdAt", 0))
+
+    # Extract approver details
+    approvals = []
+    for activity in approval_activities[:max_approvers]:
+        # Extract email from creator.actor structure
+        creator = activity.get("creator", {})
+        actor = creator.get("actor", {})
+        approver_email = actor.get("email", "")
+        approval_date = index.unix_ms_to_utc_string(activity.get("createdAt"))
+
+        approvals.append({
+            "email": approver_email,
+            "date": approval_date
+        })
+
+    return (approvals, len(approval_activities))
+
+
+def extract_signature_dates(activities_response):
+    """
+    Extract first and last signature dates from audit trail.
+
+    Filters for NEGOTIATION_APPROVE activity type (eSignatures),
+    or AGREEMENT_SIGNATURE_FINALIZE activity type (finalize signature).
+
+    Args:
+        activities_response: Response dict with "activities" key
+
+    Returns:
+        Tuple of (first_signature_utc, last_signature_utc) as strings
+        Returns ("", "") if no signature activities found
+    """
+    activities = activities_response.get("activities", [])
+
+    # Filter for signature activities (NEGOTIATION_APPROVE and AGREEMENT_SIGNATURE_FINALIZE)
+    signature_activities = [
+        activity for activity in activities
+        if activity.get("name") in ["NEGOTIATION_APPROVE", "AGREEMENT_SIGNATURE_FINALIZE"]
+    ]
+
+    if not signature_activities:
+        return ("", "")
+
+    # Get timestamps
+    timestamps = [activity.get("createdAt") for activity in signature_activities if activity.get("createdAt")]
+
+    if not timestamps:
+        return ("", "")
+
+    # Sort to find first and last
+    timestamps.sort()
+    first_utc = index.unix_ms_to_utc_string(timestamps[0])
+    last_utc = index.unix_ms_to_utc_string(timestamps[-1])
+
+    return (first_utc, last_utc)
+
+
+def extract_detailed_signatures(activities_response, max_signers=5):
+    """
+    Extract up to max_signers signature details (email + date) from audit trail.
+
+    Filters for NEGOTIATION_APPROVE and AGREEMENT_SIGNATURE_FINALIZE activity types.
+
+    Args:
+        activities_response: Response dict with "activities" key
+        max_signers: Maximum number of signers to return (default: 5)
+
+    Returns:
+        Tuple of (signatures_list, total_count)
+        - signatures_list: List of dicts with 'email' and 'date' (up to max_signers)
+        - total_count: Total number of signatures (including those beyond max_signers)
+    """
+    activities = activities_response.get("activities", [])
+
+    # Filter for signature activities
+    signature_activities = [
+        activity for activity in activities
+        if activity.get("name") in ["NEGOTIATION_APPROVE", "AGREEMENT_SIGNATURE_FINALIZE"]
+    ]
+
+    if not signature_activities:
+        return ([], 0)
+
+    # Sort by timestamp (earliest first)
+    signature_activities.sort(key=lambda a: a.get("createdAt", 0))
+
+    # Extract signer details
+    signatures = []
+    for activity in signature_activities[:max_signers]:
+        # Extract email from creator.actor structure
+        creator = activity.get("creator", {})
+        actor = creator.get("actor", {})
+        signer_email = actor.get("email", "")
+        signature_date = index.unix_ms_to_utc_string(activity.get("createdAt"))
+
+        signatures.append({
+            "email": signer_email,
+            "date": signature_date
+        })
+
+    return (signatures, len(signature_activities))
+
+
+def legacy_timeline(org_id, agreement, activities_response):
+    """
+    Build a timeline the way process_agreement() did before classify_activities().
+
+    Kept as a reference implementation to check that outputs are identical.
+    """
+    result = {
+        "agreementId": agreement.get("uuid"),
+        "agreementTitle": agreement.get("title", ""),
+        "agreementLink": index.construct_agreement_url(org_id, agreement.get("uuid")),
+        "creationDate": extract_creation_date(activities_response),
+        "createdBy": extract_created_by(activities_response),
+    }
+
+    detailed_approvals, total_approvals = extract_detailed_approvals(activities_response)
+    detailed_signatures, total_signatures = extract_detailed_signatures(activities_response)
+    first_approval, last_approval = extract_approval_dates(activities_response)
+    first_signature, last_signature = extract_signature_dates(activities_response)
+
+    for i in range(5):
+        approval = detailed_approvals[i] if i < len(detailed_approvals) else {"email": "", "date": ""}
+        result[f"approver{i+1}"] = approval["email"]
+        result[f"approvalDate{i+1}"] = approval["date"]
+    for i in range(5):
+        signature = detailed_signatures[i] if i < len(detailed_signatures) else {"email": "", "date": ""}
+        result[f"signer{i+1}"] = signature["email"]
+        result[f"signatureDate{i+1}"] = signature["date"]
+
+    result["firstApprovalDate"] = first_approval
+    result["lastApprovalDate"] = last_approval
+    result["firstSignatureDate"] = first_signature
+    result["lastSignatureDate"] = last_signature
+    result["totalApprovals"] = total_approvals
+    result["totalSignatures"] = total_signatures
+
+    return result
+
+
+def null_creator_activities():
+    """
+    Audit trail with null creators and actors on activities the timeline skips.
+
+    The creation is the last activity, so the earlier ones are each briefly
+    the earliest while the trail is read (regression case for the streaming
+    parser).
+    """
+    return {"activities": [
+        {"name": "VIEW", "createdAt": 1700000300000, "creator": None},
+        {"name": "COMMENT", "createdAt": 1700000200000, "creator": {"actor": None}},
+        {"name": "VALIDATION_ACCEPT", "createdAt": 1700000250000,
+         "creator": {"actor": {"email": "approver@example.com"}}},
+        {"name": "DOCUMENT_UPDATE", "createdAt": 1700000100000,
+         "creator": {"actor": {"email": "creator@example.com"}}},
+    ]}
+
+
+def stream_chunks(response, chunk_size=64):
+    """Serialize a response and split it into chunks, like a streamed HTTP body."""
+    body = json.dumps(response).encode("utf-8")
+    return [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+
+def time_function(func, trails, repeat):
+    """Return the best wall time in seconds of func over all trails, out of `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for agreement, trail in trails:
+            func(1, agreement, trail)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_classifier_benchmark(args):
+    """Compare legacy and single-pass extraction on synthetic audit trails."""
+    rng = random.Random(args.seed)
+    trails = [
+        ({"uuid": f"agreement-{i}", "title": f"Agreement {i}"}, synthetic_activities(rng, args.activities))
+        for i in range(args.agreements)
+    ]
+
+    # Outputs must be identical before timings mean anything
+    keys = [key for _, key in index.get_csv_columns()]
+    for agreement, trail in trails:
+        expected = [legacy_timeline(1, agreement, trail).get(key, "") for key in keys]
+        actual = index.format_csv_row(index.build_timeline(1, agreement, trail), keys)
+        if expected != actual:
+            print(f"ERROR: Output mismatch for {agreement['uuid']}")
+            sys.exit(1)
+
+    # The streaming parser must give the same timelines as the full response
+    stream_trails = trails + [({"uuid": "null-creator", "title": "Null creator"}, null_creator_activities())]
+    for agreement, trail in stream_trails:
+        streamed, _ = index.parse_activities_stream(stream_chunks(trail))
+        expected = index.format_csv_row(index.build_timeline(1, agreement, trail), keys)
+        actual = index.format_csv_row(index.build_timeline(1, agreement, streamed), keys)
+        if expected != actual:
+            print(f"ERROR: Streaming parser mismatch for {agreement['uuid']}")
+            sys.exit(1)
+
+    def single_pass_timeline(org_id, agreement, activities_response):
+        # Include date formatting, which legacy_timeline() does while extracting
+        timeline = index.build_timeline(org_id, agreement, activities_response)
+        return index.format_csv_row(timeline, keys)
+
+    legacy_seconds = time_function(legacy_timeline, trails, args.repeat)
+    single_pass_seconds = time_function(single_pass_timeline, trails, args.repeat)
+
+    print(f"Agreements: {args.agreements}, activities per agreement: {args.activities}")
+    print(f"Legacy extract_* scans: {legacy_seconds * 1000:.1f} ms")
+    print(f"Single-pass classifier: {single_pass_seconds * 1000:.1f} ms")
+    print(f"Speedup: {legacy_seconds / single_pass_seconds:.2f}x")
+
+
+def strftime_utc_string(timestamp_ms):
+    """Format a timestamp the way unix_ms_to_utc_string() originally did (reference implementation)."""
+    if timestamp_ms is None or timestamp_ms <= 0:
+        return ""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def run_timestamps_benchmark(args):
+    """Compare batch date formatting with per-value datetime.strftime()."""
+    rng = random.Random(args.seed)
+    # Audit trail timestamps cluster on a few hundred days and repeat (first/last dates)
+    base = 1700000000000
+    timestamps = [base + rng.randint(0, 400 * 86400 * 1000) for _ in range(args.count // 2)]
+    timestamps += rng.choices(timestamps, k=args.count - len(timestamps)) + [None, 0]
+
+    # Outputs must be identical before timings mean anything
+    expected = [strftime_utc_string(value) for value in timestamps]
+    if index.unix_ms_to_utc_strings(timestamps) != expected:
+        print("ERROR: Output mismatch between batch and strftime formatting")
+        sys.exit(1)
+
+    def best_of(func):
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    strftime_seconds = best_of(lambda: [strftime_utc_string(value) for value in timestamps])
+    single_seconds = best_of(lambda: [index.unix_ms_to_utc_string(value) for value in timestamps])
+    batch_seconds = best_of(lambda: index.unix_ms_to_utc_strings(timestamps))
+
+    print(f"Timestamps: {len(timestamps)}")
+    print(f"datetime.strftime per value: {strftime_seconds * 1000:.1f} ms")
+    print(f"unix_ms_to_utc_string:       {single_seconds * 1000:.1f} ms ({strftime_seconds / single_seconds:.2f}x)")
+    print(f"unix_ms_to_utc_strings:      {batch_seconds * 1000:.1f} ms ({strftime_seconds / batch_seconds:.2f}x)")
+
+
+# Execution modes compared by the e2e benchmark: (name, index.py options)
+E2E_MODES = [
+    ("sequential", ["--workers", "1"]),
+    ("threads", ["--workers", "8"]),
+    ("threads-prefetch", ["--workers", "8", "--page-prefetch", "4", "--org-workers", "2"]),
+    ("asyncio", ["--engine", "asyncio", "--workers", "4", "--max-concurrency", "32"]),
+]
+
+
+def percentile(values, q):
+    """Return the q-th quantile (0-1) of a list of numbers (nearest rank), or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def run_export(args):
+    """Run index.py in this process, saving the latency of every HTTP attempt on exit."""
+    latencies = []
+    index.add_response_observer(lambda path, status_code, latency: latencies.append(latency))
+
+    def save_latencies():
+        with open(args.latency_file, 'w', encoding='utf-8') as f:
+            json.dump(latencies, f)
+
+    # Also saved when the export exits early through sys.exit()
+    atexit.register(save_latencies)
+
+    sys.argv = ["index.py"] + [arg for arg in args.index_args if arg != "--"]
+    index.main()
+
+
+def run_mode(name, mode_args, server, workdir):
+    """
+    Run one export in a child process against the mock server.
+
+    Args:
+        name: Mode name
+        mode_args: index.py options of the mode
+        server: Running MockConcordServer
+        workdir: Directory for the mode's output, log and latency files
+
+    Returns:
+        Dictionary with seconds, latencies, peak_memory_mb, output (path of the export)
+    """
+    os.makedirs(workdir)
+    latency_file = os.path.join(workdir, "latencies.json")
+    log_file = os.path.join(workdir, "export.log")
+    command = [
+        sys.executable, os.path.abspath(__file__), "run-export",
+        "--latency-file", latency_file,
+        "--", "--base-url", server.base_url,
+    ] + mode_args
+    env = dict(os.environ, CONCORD_API_KEY="benchmark")
+
+    with open(log_file, 'w', encoding='utf-8') as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4() also returns the resource usage of the child, including its peak RSS
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode != 0:
+        print(f"ERROR: Export failed in mode {name} (exit code {process.returncode}), see {log_file}")
+        sys.exit(1)
+
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak_memory = usage.ru_maxrss / 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    with open(latency_file, encoding='utf-8') as f:
+        latencies = json.load(f)
+    outputs = [f for f in os.listdir(workdir) if f.startswith("signed_agreements_execution_time_")]
+
+    return {
+        "seconds": seconds,
+        "latencies": latencies,
+        "peak_memory_mb": peak_memory / 1024,
+        "output": os.path.join(workdir, outputs[0]) if outputs else None,
+    }
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def run_e2e_benchmark(args):
+    """Run a full export per execution mode against the mock server and compare them."""
+    if not hasattr(os, "wait4"):
+        print("ERROR: The e2e benchmark needs os.wait4() (Linux or macOS)")
+        sys.exit(1)
+
+    modes = E2E_MODES
+    if args.modes:
+        names = args.modes.split(",")
+        unknown = set(names) - set(name for name, _ in E2E_MODES)
+        if unknown:
+            print(f"ERROR: Unknown mode(s): {', '.join(sorted(unknown))}")
+            sys.exit(1)
+        modes = [mode for mode in E2E_MODES if mode[0] in names]
+
+    server = mock_server.start_server(
+        orgs=args.orgs,
+        agreements=args.agreements,
+        activities=args.activities,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        rate_limit_errors=args.rate_limit_errors,
+        server_errors=args.server_errors,
+        retry_after=0,
+        chunked=args.chunked,
+        seed=args.seed
+    )
+    total_agreements = args.orgs * args.agreements
+    workdir = tempfile.mkdtemp(prefix="export-benchmark-")
+
+    print(f"Mock server: {server.base_url}, {args.orgs} organization(s) x {args.agreements} agreement(s), "
+          f"~{args.activities} activities, {args.latency_ms:g} ms median latency, "
+          f"{args.rate_limit_errors:.1%} 429 / {args.server_errors:.1%} 5xx"
+          f"{', chunked bodies' if args.chunked else ''}")
+    print()
+    print(f"{'Mode':<18} {'Seconds':>8} {'Agreements/s':>13} {'p95 latency':>12} {'Peak memory':>12} {'Requests':>9} {'Errors':>7} {'Connections':>12}")
+
+    outputs = []
+    try:
+        for name, mode_args in modes:
+            server.reset_stats()
+            result = run_mode(name, mode_args, server, os.path.join(workdir, name))
+            p95 = percentile(result["latencies"], 0.95)
+            stats = server.stats
+            print(f"{name:<18} {result['seconds']:>8.2f} {total_agreements / result['seconds']:>13.1f} "
+                  f"{(p95 or 0) * 1000:>9.1f} ms {result['peak_memory_mb']:>9.1f} MB "
+                  f"{stats['requests']:>9} {stats['rate_limited'] + stats['server_errors']:>7} "
+                  f"{stats['connections']:>12}")
+            outputs.append((name, result["output"]))
+
+        # Every mode must export the same rows
+        print()
+        reference_name, reference = outputs[0]
+        for name, output in outputs[1:]:
+            if output is None or reference is None or read_bytes(output) != read_bytes(reference):
+                print(f"ERROR: Output of mode {name} differs from {reference_name}")
+                sys.exit(1)
+        print(f"✓ All {len(outputs)} mode(s) exported identical files")
+    finally:
+        server.shutdown()
+        server.server_close()
+        if args.keep:
+            print(f"Run files kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+
+    Returns:
+        argparse.Namespace with the parsed options
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks for the signed agreements export.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    classifier = subparsers.add_parser("classifier", help="Timeline extraction micro-benchmark")
+    classifier.add_argument("--agreements", type=int, default=200, help="Number of synthetic agreements (default: 200)")
+    classifier.add_argument("--activities", type=int, default=5000, help="Activities per audit trail (default: 5000)")
+    classifier.add_argument("--repeat", type=int, default=3, help="Runs per implementation, best is kept (default: 3)")
+    classifier.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    classifier.set_defaults(func=run_classifier_benchmark)
+
+    timestamps = subparsers.add_parser("timestamps", help="Date formatting micro-benchmark")
+    timestamps.add_argument("--count", type=int, default=200000, help="Number of timestamps (default: 200000)")
+    timestamps.add_argument("--repeat", type=int, default=3, help="Runs per implementation, best is kept (default: 3)")
+    timestamps.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    timestamps.set_defaults(func=run_timestamps_benchmark)
+
+    e2e = subparsers.add_parser("e2e", help="End-to-end exports against the mock server, per execution mode")
+    e2e.add_argument("--orgs", type=int, default=2, help="Number of organizations (default: 2)")
+    e2e.add_argument("--agreements", type=int, default=1000, help="Signed agreements per organization (default: 1000)")
+    e2e.add_argument("--activities", type=int, default=20, help="Average activities per audit trail (default: 20)")
+    e2e.add_argument("--latency-ms", type=float, default=20.0, help="Median response latency in ms (default: 20)")
+    e2e.add_argument("--latency-sigma", type=float, default=0.5,
+                     help="Spread of the log-normal latency distribution, 0 = constant (default: 0.5)")
+    e2e.add_argument("--rate-limit-errors", type=float, default=0.0, help="Share of requests answered with 429 (default: 0)")
+    e2e.add_argument("--server-errors", type=float, default=0.0, help="Share of requests answered with 5xx (default: 0)")
+    e2e.add_argument("--chunked", action="store_true",
+                     help="Have the mock server send chunked response bodies instead of a Content-Length")
+    e2e.add_argument("--modes", help=f"Comma-separated modes to run (default: all of {', '.join(name for name, _ in E2E_MODES)})")
+    e2e.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    e2e.add_argument("--keep", action="store_true", help="Keep the exports and logs of each mode")
+    e2e.set_defaults(func=run_e2e_benchmark)
+
+    # Used by e2e to run each export in a child process
+    run = subparsers.add_parser("run-export", help="Run index.py, recording request latencies (used by e2e)")
+    run.add_argument("--latency-file", required=True, help="JSON file receiving the latency of every request")
+    run.add_argument("index_args", nargs=argparse.REMAINDER, help="Options passed to index.py")
+    run.set_defaults(func=run_export)
+
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
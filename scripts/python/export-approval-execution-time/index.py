@@ -4,12 +4,16 @@ Export Signed Agreements with Approval and Execution Times
 
 This script exports all signed agreements from Concord API with complete timeline data:
 - Agreement creation date and creator email (from first activity in audit trail)
-- Detailed approval tracking: up to 5 approvers with email addresses and dates
-- Detailed signature tracking: up to 5 signers with email addresses and dates
+- Detailed approval tracking: approvers with email addresses and dates
+- Detailed signature tracking: signers with email addresses and dates
+  (5 of each by default; --max-participants N sets the number of columns,
+  or "auto" sizes them to the agreement with the most approvals/signatures)
 - First and last approval/signature dates (for backward compatibility)
 - Total counts of approvals and signatures
 
-Output: Timestamped CSV file with 31 columns of agreement timeline data
+Output: Timestamped file of agreement timeline data in the --format chosen:
+CSV (default; 31 columns with the default 5 approvers and 5 signers),
+gzip/zstd compressed CSV, JSON Lines (optionally compressed), Parquet or Arrow
 """
 
 # Configuration: Set your Concord API key here
@@ -19,16 +23,70 @@ API_KEY = "YOUR_API_KEY_HERE"  # TODO: Replace with your actual API key
 # Base URL for Concord API
 BASE_URL = "https://api.concordnow.com"
 
+import os
+import io
+import re
 import sys
 import csv
+import gzip
+import codecs
+import atexit
+import bisect
+import pstats
+import cProfile
+import json
+import math
+import time
+import zlib
+import hashlib
+import sqlite3
+import tempfile
+import heapq
+import importlib
+import functools
+import asyncio
+import queue
+import itertools
+import contextlib
+import random
+import argparse
+import threading
 import requests
-from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+MS_PER_DAY = 86400 * 1000
+
+# Day numbers since the Unix epoch that date.fromordinal() can represent
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MAX_UTC_DAY = date.max.toordinal() - _EPOCH_ORDINAL
+
+
+# "HH:MM:" for every minute of the day and "SS" for every second of a minute
+_MINUTE_STRINGS = [f"{minute // 60:02d}:{minute % 60:02d}:" for minute in range(24 * 60)]
+_SECOND_STRINGS = [f"{second:02d}" for second in range(60)]
+
+
+@functools.lru_cache(maxsize=4096)
+def _utc_day_prefix(day):
+    """Return "YYYY-MM-DD " for a day number since the Unix epoch (memoized)."""
+    return date.fromordinal(_EPOCH_ORDINAL + day).isoformat() + " "
 
 
 def unix_ms_to_utc_string(timestamp_ms):
     """
     Convert Unix timestamp (milliseconds) to UTC datetime string.
 
+    The date part is looked up per day (see _utc_day_prefix) and the time of
+    day from precomputed minute and second strings, giving the same string as
+    datetime.strftime() without building a datetime for each value.
+
     Args:
         timestamp_ms: Integer milliseconds since Unix epoch (e.g., 1750172991000)
 
@@ -38,6 +96,50 @@ def unix_ms_to_utc_string(timestamp_ms):
     if timestamp_ms is None or timestamp_ms <= 0:
         return ""
 
+    # Fractional milliseconds round like datetime does only on the slow path
+    if type(timestamp_ms) is not int:
+        return _unix_ms_to_utc_string_slow(timestamp_ms)
+    day, ms_of_day = divmod(timestamp_ms, MS_PER_DAY)
+    if day > _MAX_UTC_DAY:
+        return _unix_ms_to_utc_string_slow(timestamp_ms)
+    minute, second = divmod(ms_of_day // 1000, 60)
+    return _utc_day_prefix(day) + _MINUTE_STRINGS[minute] + _SECOND_STRINGS[second]
+
+
+def unix_ms_to_utc_strings(timestamps_ms):
+    """
+    Convert a sequence of Unix timestamps (milliseconds) to UTC datetime strings.
+
+    Batch version of unix_ms_to_utc_string(), with the per-value work inlined.
+
+    Args:
+        timestamps_ms: Iterable of integer milliseconds since Unix epoch (or None)
+
+    Returns:
+        List of "YYYY-MM-DD HH:MM:SS" strings ("" for missing timestamps)
+    """
+    day_prefix = _utc_day_prefix
+    minute_strings = _MINUTE_STRINGS
+    second_strings = _SECOND_STRINGS
+    strings = []
+    append = strings.append
+
+    for timestamp_ms in timestamps_ms:
+        if timestamp_ms is None or timestamp_ms <= 0:
+            append("")
+            continue
+        day, ms_of_day = divmod(timestamp_ms, MS_PER_DAY)
+        if day > _MAX_UTC_DAY or type(timestamp_ms) is not int:
+            append(_unix_ms_to_utc_string_slow(timestamp_ms))
+            continue
+        minute, second = divmod(ms_of_day // 1000, 60)
+        append(day_prefix(day) + minute_strings[minute] + second_strings[second])
+
+    return strings
+
+
+def _unix_ms_to_utc_string_slow(timestamp_ms):
+    """Format a timestamp through datetime, exiting on values it cannot represent."""
     try:
         # Convert milliseconds to seconds and create UTC datetime
         utc_dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
@@ -49,606 +151,4775 @@ def unix_ms_to_utc_string(timestamp_ms):
         sys.exit(1)
 
 
+def unix_ms_to_iso_string(timestamp_ms):
+    """
+    Convert Unix timestamp (milliseconds) to an ISO 8601 UTC string.
+
+    Args:
+        timestamp_ms: Integer milliseconds since Unix epoch
+
+    Returns:
+        String in format "YYYY-MM-DDTHH:MM:SSZ", or None if no timestamp
+    """
+    utc_string = unix_ms_to_utc_string(timestamp_ms)
+    if not utc_string:
+        return None
+    return utc_string.replace(" ", "T") + "Z"
+
+
+def utc_string_to_unix_ms(value):
+    """
+    Convert a UTC datetime string back to a Unix timestamp (milliseconds).
+
+    Accepts the output of unix_ms_to_utc_string() and unix_ms_to_iso_string().
+
+    Args:
+        value: "YYYY-MM-DD HH:MM:SS" or "YYYY-MM-DDTHH:MM:SSZ" string (or empty/None)
+
+    Returns:
+        Integer milliseconds since Unix epoch, or None for an empty value
+    """
+    if not value:
+        return None
+
+    try:
+        utc_dt = datetime.strptime(value.rstrip("Z").replace("T", " "), "%Y-%m-%d %H:%M:%S")
+    except ValueError as e:
+        print(f"ERROR: Failed to parse date {value}: {e}")
+        sys.exit(1)
+
+    return int(utc_dt.replace(tzinfo=timezone.utc).timestamp()) * 1000
+
+
+def valid_timestamp(timestamp_ms):
+    """
+    Normalize a timestamp from the audit trail.
+
+    Args:
+        timestamp_ms: createdAt value (may be missing, zero or negative)
+
+    Returns:
+        The timestamp, or None if it is missing or not positive
+    """
+    if timestamp_ms is None or timestamp_ms <= 0:
+        return None
+    return timestamp_ms
+
+
+# HTTP status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Chunk size in which audit trail responses are read and parsed (see get_activities)
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Shared keep-alive HTTP session used by get() (see configure_session)
+_session = None
+_session_lock = threading.Lock()
+
+# Retry and rate limiting settings used by get() (see configure_retries)
+_max_retries = 5
+_backoff_base = 1.0
+_backoff_max = 60.0
+_rate_limiter = None
+
+# Callbacks notified of every HTTP attempt made by get() (see add_response_observer)
+_response_observers = []
+
+# Per-run HTTP counters reported in the end-of-run summary
+_http_stats = {
+    "requests": 0,
+    "connections": 0,
+    "retries": 0,
+    "throttle_waits": 0,
+    "sleep_seconds": 0.0,
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe client-side rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Each request
+    takes one token, waiting for the next one when the bucket is empty. A server
+    Retry-After can pause the whole bucket so every worker backs off together.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+            Number of seconds spent waiting (0.0 if a token was available)
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                else:
+                    delay = (1.0 - self.tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """
+        Stop handing out tokens for the given number of seconds.
+
+        Args:
+            seconds: Pause duration (e.g., from a Retry-After header)
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+def _count(key, amount=1):
+    """Increment a per-run HTTP counter (thread-safe)."""
+    with _session_lock:
+        _http_stats[key] += amount
+
+
+class CountingHTTPConnection(HTTPConnection):
+    """urllib3 connection counting every TCP connect, including reconnects of a dropped connection."""
+
+    def connect(self):
+        super().connect()
+        _count("connections")
+
+
+class CountingHTTPSConnection(HTTPSConnection):
+    """HTTPS version of CountingHTTPConnection."""
+
+    def connect(self):
+        super().connect()
+        _count("connections")
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count the connections they open (see get_http_stats)."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+
+def configure_session(pool_size=10):
+    """
+    Create the shared HTTP session used by get().
+
+    Connections to the API host are kept alive and reused across requests.
+    The pool should be at least as large as the number of worker threads,
+    otherwise extra connections are opened and discarded under load.
+
+    Args:
+        pool_size: Maximum number of connections kept open per host
+
+    Returns:
+        The configured requests.Session
+    """
+    global _session
+
+    session = requests.Session()
+    adapter = CountingHTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip"})
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = session
+        for key in _http_stats:
+            _http_stats[key] = type(_http_stats[key])()
+
+    return session
+
+
+def configure_retries(max_retries=5, rate_limit=0.0, backoff_base=1.0, backoff_max=60.0):
+    """
+    Configure the retry policy and client-side rate limit used by get().
+
+    Args:
+        max_retries: Retries per request after the first attempt (0 = fail fast)
+        rate_limit: Maximum sustained requests per second (0 = unlimited)
+        backoff_base: Base delay in seconds for exponential backoff
+        backoff_max: Upper bound in seconds for a single backoff delay
+    """
+    global _max_retries, _rate_limiter, _backoff_base, _backoff_max
+
+    _max_retries = max_retries
+    _backoff_base = backoff_base
+    _backoff_max = backoff_max
+    _rate_limiter = TokenBucket(rate_limit) if rate_limit > 0 else None
+
+
+def get_session():
+    """
+    Return the shared HTTP session, creating it with default settings if needed.
+
+    Returns:
+        requests.Session
+    """
+    if _session is None:
+        configure_session()
+    return _session
+
+
+def get_http_stats():
+    """
+    Report per-run HTTP counters for the end-of-run summary.
+
+    Returns:
+        Dictionary with 'requests', 'connections' (TCP connects, see
+        CountingHTTPAdapter), 'retries', 'throttle_waits' and 'sleep_seconds'
+        for this run
+    """
+    with _session_lock:
+        return dict(_http_stats)
+
+
+def add_response_observer(callback):
+    """
+    Register a callback notified of every HTTP attempt made by get().
+
+    Callbacks run on the thread that made the request, so they must be thread-safe.
+
+    Args:
+        callback: Callable (path, status_code, latency_seconds); status_code
+            is None when the request failed with a network error
+    """
+    _response_observers.append(callback)
+
+
+def _notify_observers(path, status_code, latency):
+    """Pass the outcome of one HTTP attempt to the registered observers."""
+    for callback in _response_observers:
+        callback(path, status_code, latency)
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date (or None)
+
+    Returns:
+        Delay in seconds, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Compute how long to wait before retrying a failed request.
+
+    Uses exponential backoff with full jitter. A server-provided Retry-After
+    is always honored, with a little jitter added so workers do not retry in lockstep.
+
+    Args:
+        attempt: Zero-based index of the attempt that failed
+        retry_after: Delay requested by the server in seconds, if any
+
+    Returns:
+        Delay in seconds
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, _backoff_base)
+
+    return random.uniform(0, min(_backoff_max, _backoff_base * (2 ** attempt)))
+
+
+def _sleep_before_retry(path, attempt, reason, retry_after=None):
+    """Log and sleep before retrying a request, recording retry statistics."""
+    delay = backoff_delay(attempt, retry_after)
+    if retry_after is not None and _rate_limiter is not None:
+        _rate_limiter.pause(retry_after)
+
+    log_warning(
+        "retry",
+        f"{reason} for {path}, retrying in {delay:.1f}s (retry {attempt + 1}/{_max_retries})",
+        path=path,
+        delay=round(delay, 3)
+    )
+    _count("retries")
+    _count("sleep_seconds", delay)
+    time.sleep(delay)
+
+
 def get(path):
     """
-    HTTP GET wrapper with authentication and fail-fast error handling.
+    HTTP GET wrapper with authentication, retries and fail-fast error handling.
+
+    Requests go through the shared keep-alive session (see configure_session),
+    so connections to the API are reused instead of re-handshaking every call.
+    Rate limiting (429), transient server errors (5xx) and network errors are
+    retried with exponential backoff (honoring Retry-After) up to the
+    configured number of retries (see configure_retries).
 
     Args:
         path: API endpoint path (e.g., "/api/rest/1/user/me/organizations")
 
     Returns:
-        Parsed JSON response
+        Parsed JSON response
+
+    Exits:
+        Exits with status code 1 on a non-retryable HTTP error, or once retries are exhausted
+    """
+    response, _ = _send(path)
+    return _decode_json(path, response)
+
+
+def get_conditional(path, validators=None):
+    """
+    HTTP GET revalidating a cached response (see get()).
+
+    With validators, If-None-Match / If-Modified-Since are sent and the server
+    can answer 304 Not Modified without a body.
+
+    Args:
+        path: API endpoint path
+        validators: (etag, last_modified) of the cached response, or None
+
+    Returns:
+        Tuple of (response, validators): the parsed JSON response and its
+        validators, or (None, validators) if the cached response is still valid
+
+    Exits:
+        Exits with status code 1 on a non-retryable HTTP error, or once retries are exhausted
+    """
+    response, _ = _send(path, conditional_headers(validators))
+    if response.status_code == 304:
+        return None, validators
+    return _decode_json(path, response), response_validators(response)
+
+
+def get_activities(path, validators=None):
+    """
+    HTTP GET of an audit trail, parsed as the body streams in (see get_conditional()).
+
+    The body is read in chunks of STREAM_CHUNK_BYTES and parsed by
+    parse_activities_stream(), so only the activities the timeline needs are
+    kept instead of the whole decoded payload. A connection dropped while
+    reading the body is retried like any other network error.
+
+    Args:
+        path: API endpoint path of the audit trail
+        validators: (etag, last_modified) of a cached response, or None
+
+    Returns:
+        Tuple of (response, validators): the reduced {"activities": [...]}
+        response and its validators, or (None, validators) on 304 Not Modified
+
+    Exits:
+        Exits with status code 1 on a non-retryable HTTP error, invalid JSON,
+        or once retries are exhausted
+    """
+    headers = conditional_headers(validators)
+    attempt = 0
+    while True:
+        response, started = _send(path, headers, stream=True)
+        if response.status_code == 304:
+            return None, validators
+
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_BYTES)
+        body_read = False
+        try:
+            with profile_stage("decode"):
+                activities_response, size = parse_activities_stream(chunks)
+            # Read what follows the JSON object (whitespace, end of a chunked
+            # body): urllib3 only returns a connection to the pool once the
+            # body has been read to the end
+            for chunk in chunks:
+                size += len(chunk)
+            body_read = True
+        except requests.exceptions.RequestException as e:
+            _record_attempt(path, None, started, 0)
+            if attempt < _max_retries:
+                _sleep_before_retry(path, attempt, "Network error while reading the response")
+                attempt += 1
+                continue
+
+            print(f"ERROR: Network request failed: {path}")
+            print(f"Error: {e}")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"ERROR: Invalid JSON response: {path}")
+            print(f"Error: {e}")
+            sys.exit(1)
+        finally:
+            if not body_read:
+                response.close()
+
+        # The attempt ends once the whole body has been read
+        _record_attempt(path, 200, started, size)
+        return activities_response, response_validators(response)
+
+
+def conditional_headers(validators):
+    """
+    Build the headers of a conditional request.
+
+    Args:
+        validators: (etag, last_modified) of a cached response, or None
+
+    Returns:
+        Dictionary with If-None-Match and/or If-Modified-Since (empty without validators)
+    """
+    headers = {}
+    if validators is not None:
+        etag, last_modified = validators
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def response_validators(response):
+    """
+    Read the cache validators of a response.
+
+    Args:
+        response: requests.Response
+
+    Returns:
+        (etag, last_modified) tuple, or None if the response has neither header
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag is None and last_modified is None:
+        return None
+    return etag, last_modified
+
+
+def _decode_json(path, response):
+    """Parse the JSON body of a successful response, exiting if it is invalid."""
+    try:
+        with profile_stage("decode"):
+            return response.json()
+    except ValueError as e:
+        print(f"ERROR: Invalid JSON response: {path}")
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def _record_attempt(path, status_code, started, size):
+    """Pass one HTTP attempt, started at time.monotonic() `started`, to the observers and run metrics."""
+    latency = time.monotonic() - started
+    _notify_observers(path, status_code, latency)
+    _run_metrics.record_response(path, status_code, latency, size)
+
+
+def _send(path, extra_headers=None, stream=False):
+    """
+    Send a GET request with the retry policy of get().
+
+    Args:
+        path: API endpoint path
+        extra_headers: Additional request headers (conditional request headers
+            make 304 Not Modified an accepted answer)
+        stream: Leave the body of a 200 response unread, for the caller to
+            stream; the caller then records the attempt with _record_attempt()
+            once the body has been read, so its latency covers the download
+
+    Returns:
+        Tuple of (requests.Response with status 200, or 304 for a conditional
+        request, and the time.monotonic() at which the last attempt started)
+    """
+    url = f"{BASE_URL}{path}"
+    headers = {
+        "X-API-KEY": API_KEY,
+        "Content-Type": "application/json"
+    }
+    if extra_headers:
+        headers.update(extra_headers)
+    session = get_session()
+
+    attempt = 0
+    while True:
+        if _rate_limiter is not None:
+            waited = _rate_limiter.acquire()
+            if waited > 0:
+                _count("throttle_waits")
+                _count("sleep_seconds", waited)
+
+        started = time.monotonic()
+        try:
+            _count("requests")
+            response = session.get(url, headers=headers, timeout=30, stream=stream)
+        except requests.exceptions.RequestException as e:
+            _record_attempt(path, None, started, 0)
+            if attempt < _max_retries:
+                _sleep_before_retry(path, attempt, "Network error")
+                attempt += 1
+                continue
+
+            print(f"ERROR: Network request failed: {path}")
+            print(f"Error: {e}")
+            sys.exit(1)
+
+        if not (stream and response.status_code == 200):
+            _record_attempt(path, response.status_code, started, len(response.content))
+
+        if response.status_code in RETRYABLE_STATUS_CODES and attempt < _max_retries:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            _sleep_before_retry(path, attempt, f"Status code {response.status_code}", retry_after)
+            attempt += 1
+            continue
+
+        if response.status_code == 304 and extra_headers:
+            return response, started
+
+        # Fail-fast error handling - exit on any other non-200 status
+        if response.status_code != 200:
+            print(f"ERROR: API request failed: {path}")
+            print(f"Status code: {response.status_code}")
+            print(f"Response: {response.text}")
+            sys.exit(1)
+
+        return response, started
+
+
+def endpoint_template(path):
+    """
+    Name the API endpoint of a request path, for per-endpoint metrics.
+
+    Args:
+        path: API endpoint path, with or without query string
+
+    Returns:
+        "organizations", "agreements_page", "activities" or "other"
+    """
+    path = path.split("?", 1)[0]
+    if path.endswith("/activities"):
+        return "activities"
+    if path.endswith("/agreements"):
+        return "agreements_page"
+    if path.endswith("/user/me/organizations"):
+        return "organizations"
+    return "other"
+
+
+class RunMetrics:
+    """
+    Per-run instrumentation: HTTP metrics per endpoint and time spent per stage.
+
+    For each endpoint template, get() records every attempt's latency (in a
+    fixed-bucket histogram and a QuantileSketch for percentiles), the decoded
+    response bytes (after gzip, not the bytes on the wire) and the status
+    codes (None for network errors). Cached endpoints also count how each
+    response was served (see CACHE_OUTCOMES). Stage timings are added up
+    across threads, so concurrent stages can exceed the wall time.
+    Thread-safe.
+    """
+
+    # Upper bounds in seconds of the latency histogram buckets (Prometheus "le")
+    LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+    STAGES = ["listing", "fetch", "extract", "write"]
+
+    # Served from the cache without a request, revalidated by a 304, or downloaded
+    CACHE_OUTCOMES = ["hit", "not_modified", "miss"]
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        # {endpoint: {"requests", "bytes", "latency_sum", "buckets", "statuses", "sketch"}}
+        self.endpoints = {}
+        self.stage_seconds = {stage: 0.0 for stage in self.STAGES}
+        self.stage_counts = {stage: 0 for stage in self.STAGES}
+        # {endpoint: {cache outcome: count}}
+        self.cache = {}
+        # Listing progress, updated as agreement pages arrive
+        self.agreements_listed = 0
+        self.organizations_listed = 0
+
+    def record_listing_page(self, count, last_page):
+        """
+        Record one page of an organization's agreements listing.
+
+        Args:
+            count: Agreements on the page
+            last_page: Whether the organization's listing ends with this page
+        """
+        with self.lock:
+            self.agreements_listed += count
+            if last_page:
+                self.organizations_listed += 1
+
+    def record_response(self, path, status_code, latency, size):
+        """
+        Record one HTTP attempt.
+
+        Args:
+            path: API endpoint path
+            status_code: HTTP status code, or None for a network error
+            latency: Seconds from sending the request to receiving the response
+            size: Decoded response body size in bytes
+        """
+        endpoint = endpoint_template(path)
+        bucket = bisect.bisect_left(self.LATENCY_BUCKETS, latency)
+        status = str(status_code) if status_code is not None else "error"
+
+        with self.lock:
+            metrics = self.endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self.endpoints[endpoint] = {
+                    "requests": 0,
+                    "bytes": 0,
+                    "latency_sum": 0.0,
+                    # One count per bucket, plus one for latencies above the last bound
+                    "buckets": [0] * (len(self.LATENCY_BUCKETS) + 1),
+                    "statuses": {},
+                    "sketch": QuantileSketch(),
+                }
+            metrics["requests"] += 1
+            metrics["bytes"] += size
+            metrics["latency_sum"] += latency
+            metrics["buckets"][bucket] += 1
+            metrics["statuses"][status] = metrics["statuses"].get(status, 0) + 1
+            metrics["sketch"].add(latency)
+
+    def record_cache(self, path, outcome):
+        """
+        Record how a response of a cached endpoint was served.
+
+        Args:
+            path: API endpoint path
+            outcome: One of CACHE_OUTCOMES
+        """
+        endpoint = endpoint_template(path)
+        with self.lock:
+            outcomes = self.cache.get(endpoint)
+            if outcomes is None:
+                outcomes = self.cache[endpoint] = {key: 0 for key in self.CACHE_OUTCOMES}
+            outcomes[outcome] += 1
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Time a block of work as part of a stage.
+
+        Args:
+            name: One of STAGES
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.stage_seconds[name] += elapsed
+                self.stage_counts[name] += 1
+
+    def endpoint_report(self):
+        """
+        Summarize the HTTP metrics per endpoint.
+
+        Returns:
+            Dictionary of endpoint to requests, bytes, statusCodes and latency
+            (seconds: sum, p50, p95, p99 and cumulative histogram buckets)
+        """
+        report = {}
+        with self.lock:
+            for endpoint, metrics in sorted(self.endpoints.items()):
+                cumulative = list(itertools.accumulate(metrics["buckets"]))
+                bounds = [str(bound) for bound in self.LATENCY_BUCKETS] + ["+Inf"]
+                sketch = metrics["sketch"]
+                report[endpoint] = {
+                    "requests": metrics["requests"],
+                    "bytes": metrics["bytes"],
+                    "statusCodes": dict(sorted(metrics["statuses"].items())),
+                    "latency": {
+                        "sum": round(metrics["latency_sum"], 6),
+                        "p50": round(sketch.quantile(0.5), 6),
+                        "p95": round(sketch.quantile(0.95), 6),
+                        "p99": round(sketch.quantile(0.99), 6),
+                        "buckets": dict(zip(bounds, cumulative)),
+                    },
+                }
+        return report
+
+    def cache_report(self):
+        """
+        Summarize the cache outcomes per endpoint.
+
+        Returns:
+            Dictionary of endpoint to the count of each outcome and its rate
+            ("hitRate", "notModifiedRate", "missRate")
+        """
+        report = {}
+        with self.lock:
+            for endpoint, outcomes in sorted(self.cache.items()):
+                total = sum(outcomes.values()) or 1
+                report[endpoint] = dict(
+                    outcomes,
+                    hitRate=round(outcomes["hit"] / total, 4),
+                    notModifiedRate=round(outcomes["not_modified"] / total, 4),
+                    missRate=round(outcomes["miss"] / total, 4)
+                )
+        return report
+
+    def stage_report(self):
+        """
+        Summarize the stage timings.
+
+        Returns:
+            Dictionary of stage to {"seconds", "count"}
+        """
+        with self.lock:
+            return {
+                stage: {"seconds": round(self.stage_seconds[stage], 3), "count": self.stage_counts[stage]}
+                for stage in self.STAGES
+            }
+
+
+# Instrumentation of the current run, updated by get() and the export stages
+_run_metrics = RunMetrics()
+
+
+class StageProfiler:
+    """
+    Opt-in cProfile profiling of the CPU-bound stages (--profile).
+
+    Stages are "decode" (JSON decoding in get()), "extract" (build_timeline)
+    and "write" (writing a row to the outputs). Each thread gets its own
+    profiler per stage, and the profiles of a stage are merged when written.
+    Python 3.12+ allows only one active profiler per process, so there a block
+    that starts while another one is being profiled runs unprofiled (counted
+    in `skipped`), and the active profiler also sees other threads' calls.
+    """
+
+    STAGES = ["decode", "extract", "write"]
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.profiles = {stage: [] for stage in self.STAGES}
+        self.profiled = {stage: 0 for stage in self.STAGES}
+        self.skipped = {stage: 0 for stage in self.STAGES}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Profile a block of work as part of a stage.
+
+        Args:
+            name: One of STAGES
+        """
+        if getattr(self.local, "active", False):
+            # Already profiling on this thread
+            yield
+            return
+
+        profiles = getattr(self.local, "profiles", None)
+        if profiles is None:
+            profiles = self.local.profiles = {}
+        profile = profiles.get(name)
+        if profile is None:
+            profile = profiles[name] = cProfile.Profile()
+
+        try:
+            profile.enable()
+        except ValueError:
+            # Another thread is being profiled (Python 3.12+)
+            with self.lock:
+                self.skipped[name] += 1
+            yield
+            return
+
+        self.local.active = True
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.local.active = False
+            with self.lock:
+                self.profiled[name] += 1
+                # Only profiles that ran at least once hold stats to merge
+                if profile not in self.profiles[name]:
+                    self.profiles[name].append(profile)
+
+    def write(self, directory, top=20):
+        """
+        Write one merged profile per stage and print its top hotspots.
+
+        Args:
+            directory: Directory receiving <stage>.prof files (created if missing)
+            top: Number of functions to print per stage, by own time
+        """
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            print(f"ERROR: Failed to create profile directory {directory}: {e}")
+            sys.exit(1)
+
+        for stage in self.STAGES:
+            with self.lock:
+                profiles = list(self.profiles[stage])
+                profiled = self.profiled[stage]
+                skipped = self.skipped[stage]
+            if not profiled:
+                continue
+
+            filename = os.path.join(directory, f"{stage}.prof")
+            stats = pstats.Stats(*profiles, stream=sys.stdout)
+            stats.dump_stats(filename)
+
+            print(f"Profile of stage '{stage}': {profiled} block(s) profiled"
+                  + (f", {skipped} skipped" if skipped else "") + f", written to {filename}")
+            stats.sort_stats("tottime").print_stats(top)
+
+
+# Optional profiler of the CPU-bound stages (see configure_profiler)
+_profiler = None
+
+
+def configure_profiler():
+    """
+    Enable per-stage profiling (--profile).
+
+    Returns:
+        The StageProfiler instance
+    """
+    global _profiler
+
+    _profiler = StageProfiler()
+    return _profiler
+
+
+def profile_stage(name):
+    """
+    Profile a block as part of a stage when profiling is enabled.
+
+    Args:
+        name: One of StageProfiler.STAGES
+
+    Returns:
+        Context manager (does nothing unless configure_profiler() was called)
+    """
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.stage(name)
+
+
+class RunLog:
+    """
+    Warnings summary and optional structured log of a run.
+
+    Warnings are counted per category (keeping the first few messages as
+    examples) for the end-of-run summary instead of being printed as they
+    happen. With a log file, every event and warning is also appended as one
+    JSON object per line ({"time", "level", "event", ...fields}). Thread-safe.
+    """
+
+    # Warning messages kept per category for the summary
+    MAX_EXAMPLES = 3
+
+    def __init__(self, path=None, echo_warnings=False):
+        self.path = path
+        self.echo_warnings = echo_warnings
+        self.lock = threading.Lock()
+        # {category: [count, [example messages]]}
+        self.warnings = {}
+        self.file = None
+
+        if path:
+            try:
+                self.file = open(path, 'a', encoding='utf-8')
+            except IOError as e:
+                print(f"ERROR: Failed to open log file {path}: {e}")
+                sys.exit(1)
+
+    def event(self, event, level="info", **fields):
+        """
+        Append an event to the log file (if any).
+
+        Args:
+            event: Event name, e.g. "agreement" or "progress"
+            level: "info" or "warning"
+            **fields: JSON-serializable event fields
+        """
+        if self.file is None:
+            return
+        record = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "level": level,
+            "event": event,
+        }
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            if self.file is not None:
+                self.file.write(line)
+
+    def warning(self, category, message, **fields):
+        """
+        Record a warning for the summary and the log file.
+
+        Args:
+            category: Warning category, e.g. "retry" or "truncated"
+            message: Human-readable message
+            **fields: JSON-serializable details for the log file
+        """
+        with self.lock:
+            entry = self.warnings.setdefault(category, [0, []])
+            entry[0] += 1
+            if len(entry[1]) < self.MAX_EXAMPLES:
+                entry[1].append(message)
+        if self.echo_warnings:
+            print(f"  WARNING: {message}")
+        self.event("warning", level="warning", category=category, message=message, **fields)
+
+    def print_summary(self):
+        """Print warning counts per category, with a few example messages."""
+        with self.lock:
+            warnings = sorted(self.warnings.items())
+        if not warnings:
+            return
+
+        print(f"Warnings: {sum(count for _, (count, _) in warnings)}")
+        for category, (count, examples) in warnings:
+            print(f"  {category}: {count}")
+            for message in examples:
+                print(f"    {message}")
+            if count > len(examples):
+                print(f"    ... and {count - len(examples)} more")
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        """Flush and close the log file (safe to call twice)."""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+# Warnings summary and structured log of the run (see configure_run_log)
+_run_log = None
+
+
+def configure_run_log(path=None, echo_warnings=False):
+    """
+    Collect warnings for the end-of-run summary, optionally logging events to a file.
+
+    Args:
+        path: JSON Lines log file, appended to (None = no log file)
+        echo_warnings: Also print each warning as it happens
+
+    Returns:
+        The RunLog instance
+    """
+    global _run_log
+
+    _run_log = RunLog(path, echo_warnings=echo_warnings)
+    atexit.register(_run_log.close)
+    return _run_log
+
+
+def log_warning(category, message, **fields):
+    """
+    Report a warning: collected by the run log if configured, printed otherwise.
+
+    Args:
+        category: Warning category, e.g. "retry" or "truncated"
+        message: Human-readable message
+        **fields: JSON-serializable details for the log file
+    """
+    if _run_log is None:
+        print(f"  WARNING: {message}")
+        return
+    _run_log.warning(category, message, **fields)
+
+
+def log_event(event, **fields):
+    """Append an event to the structured log, if one is configured (see RunLog.event)."""
+    if _run_log is not None:
+        _run_log.event(event, **fields)
+
+
+def write_file_atomically(filename, content, description):
+    """
+    Write a text file through a temporary file, so readers never see it half written.
+
+    Args:
+        filename: Output filename
+        content: Text to write
+        description: What the file is, for the error message
+
+    Exits:
+        Exits with status code 1 if the file cannot be written
+    """
+    temp_filename = f"{filename}.part"
+    try:
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_filename, filename)
+    except (IOError, OSError) as e:
+        print(f"ERROR: Failed to write {description}: {e}")
+        sys.exit(1)
+
+
+def format_prometheus_metrics(metrics, run_info):
+    """
+    Format run metrics in the Prometheus text exposition format.
+
+    Meant for node_exporter's textfile collector: the file describes the last
+    run, so all values are gauges or counters of that run.
+
+    Args:
+        metrics: RunMetrics of the run
+        run_info: Dictionary with completed (bool), duration_seconds,
+            finished_at (Unix seconds) and agreements (exported count)
+
+    Returns:
+        Text of the metrics file
+    """
+    prefix = "concord_export"
+    lines = []
+
+    def metric(name, metric_type, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+        for suffix, labels, value in samples:
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+            lines.append(f"{prefix}_{name}{suffix}{{{label_text}}} {value}" if label_text
+                         else f"{prefix}_{name}{suffix} {value}")
+
+    metric("success", "gauge", "Whether the last export completed (1) or failed (0).",
+           [("", [], int(run_info["completed"]))])
+    metric("duration_seconds", "gauge", "Wall time of the last export.",
+           [("", [], round(run_info["duration_seconds"], 3))])
+    metric("finished_timestamp_seconds", "gauge", "Unix time the last export finished.",
+           [("", [], int(run_info["finished_at"]))])
+    metric("agreements_exported", "gauge", "Agreements written by the last export.",
+           [("", [], run_info["agreements"])])
+
+    endpoints = metrics.endpoint_report()
+    latency_samples = []
+    for endpoint, report in endpoints.items():
+        for bound, count in report["latency"]["buckets"].items():
+            latency_samples.append(("_bucket", [("endpoint", endpoint), ("le", bound)], count))
+        latency_samples.append(("_sum", [("endpoint", endpoint)], report["latency"]["sum"]))
+        latency_samples.append(("_count", [("endpoint", endpoint)], report["requests"]))
+    metric("http_request_duration_seconds", "histogram", "Latency of API requests, by endpoint.",
+           latency_samples)
+    metric("http_responses_total", "counter", "API responses by endpoint and status code (error = network error).",
+           [("", [("endpoint", endpoint), ("status", status)], count)
+            for endpoint, report in endpoints.items()
+            for status, count in report["statusCodes"].items()])
+    metric("http_response_bytes_total", "counter", "Decoded (uncompressed) bytes of API response bodies, by endpoint.",
+           [("", [("endpoint", endpoint)], report["bytes"]) for endpoint, report in endpoints.items()])
+    metric("cache_responses_total", "counter",
+           "Responses of cached endpoints by outcome (hit, not_modified = revalidated by a 304, miss).",
+           [("", [("endpoint", endpoint), ("outcome", outcome)], report[outcome])
+            for endpoint, report in metrics.cache_report().items()
+            for outcome in RunMetrics.CACHE_OUTCOMES])
+    metric("stage_seconds_total", "counter", "Time spent per export stage, summed over workers.",
+           [("", [("stage", stage)], report["seconds"]) for stage, report in metrics.stage_report().items()])
+
+    return "\n".join(lines) + "\n"
+
+
+class ActivityCache:
+    """
+    Persistent on-disk cache of agreement audit trails, stored in SQLite.
+
+    Entries are keyed by (org_id, agreement uuid) and hold the zlib-compressed
+    JSON activities response with its validators (ETag, Last-Modified).
+    Entries older than the TTL are not served as-is but revalidated with a
+    conditional request, and the least recently used entries are evicted once
+    max_entries is exceeded. Agreement listing pages that came with validators
+    are kept in a second table and revalidated on every run.
+    Safe to share between worker threads, and between processes (e.g.
+    concurrent --shard runs): each write is committed in its own short
+    transaction, and a locked database is waited for up to BUSY_TIMEOUT
+    seconds.
+    """
+
+    # Write the access times of cache hits in one transaction per this many hits
+    COMMIT_INTERVAL = 200
+
+    # Seconds to wait for another process's write transaction to finish
+    BUSY_TIMEOUT = 60
+
+    def __init__(self, path, ttl_seconds=7 * 86400, max_entries=200000, refresh=False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.evictions = 0
+        self.lock = threading.Lock()
+        # (accessed_at, org_id, uuid) of cache hits not written yet
+        self.pending_accesses = []
+
+        self.conn = sqlite3.connect(path, timeout=self.BUSY_TIMEOUT, check_same_thread=False)
+        # Readers do not block the writer of another process (and vice versa)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS activities ("
+            " org_id TEXT NOT NULL,"
+            " uuid TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " PRIMARY KEY (org_id, uuid))"
+        )
+        # Caches written before validators were stored
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(activities)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE activities ADD COLUMN {column} TEXT")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS activities_accessed_at ON activities (accessed_at)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS listing_pages ("
+            " path TEXT PRIMARY KEY,"
+            " body BLOB NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        self.entries = self.conn.execute("SELECT COUNT(*) FROM activities").fetchone()[0]
+        self._evict()
+        self.conn.commit()
+
+    def get(self, org_id, agreement_uid):
+        """
+        Look up a cached activities response.
+
+        Args:
+            org_id: Organization ID
+            agreement_uid: Agreement UID
+
+        Returns:
+            Tuple of (response, validators): the response dict of a fresh entry
+            (else None), and the (etag, last_modified) validators of an expired
+            entry, or of any entry with --refresh, to revalidate (else None)
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, fetched_at, etag, last_modified FROM activities WHERE org_id = ? AND uuid = ?",
+                (str(org_id), agreement_uid)
+            ).fetchone()
+            if row is None:
+                return None, None
+
+            now = time.time()
+            if self.refresh or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                validators = (row[2], row[3]) if row[2] or row[3] else None
+                return None, validators
+
+            self.pending_accesses.append((now, str(org_id), agreement_uid))
+            if len(self.pending_accesses) >= self.COMMIT_INTERVAL:
+                self._write_accesses()
+                self.conn.commit()
+
+        return json.loads(zlib.decompress(row[0])), None
+
+    def revalidate(self, org_id, agreement_uid):
+        """
+        Mark an expired entry as fresh after a 304 Not Modified and return it.
+
+        Args:
+            org_id: Organization ID
+            agreement_uid: Agreement UID
+
+        Returns:
+            Activities response dict, or None if the entry has been evicted meanwhile
+        """
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body FROM activities WHERE org_id = ? AND uuid = ?",
+                (str(org_id), agreement_uid)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self.conn.execute(
+                "UPDATE activities SET fetched_at = ?, accessed_at = ? WHERE org_id = ? AND uuid = ?",
+                (now, now, str(org_id), agreement_uid)
+            )
+            self.conn.commit()
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, org_id, agreement_uid, response, validators=None):
+        """
+        Store an activities response, evicting least recently used entries if needed.
+
+        Args:
+            org_id: Organization ID
+            agreement_uid: Agreement UID
+            response: Activities response dict
+            validators: (etag, last_modified) of the response, or None
+        """
+        body = zlib.compress(json.dumps(response, separators=(",", ":")).encode("utf-8"))
+        etag, last_modified = validators or (None, None)
+        now = time.time()
+
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE activities SET body = ?, fetched_at = ?, accessed_at = ?, etag = ?, last_modified = ?"
+                " WHERE org_id = ? AND uuid = ?",
+                (body, now, now, etag, last_modified, str(org_id), agreement_uid)
+            )
+            if cursor.rowcount == 0:
+                self.conn.execute(
+                    "INSERT INTO activities (org_id, uuid, body, fetched_at, accessed_at, etag, last_modified)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (str(org_id), agreement_uid, body, now, now, etag, last_modified)
+                )
+                self.entries += 1
+
+            self._evict()
+            self.conn.commit()
+
+    def get_page_validators(self, path):
+        """
+        Look up the validators of a cached listing page.
+
+        Args:
+            path: API path of the page, including its query string
+
+        Returns:
+            (etag, last_modified) tuple, or None if the page is not cached
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM listing_pages WHERE path = ?", (path,)
+            ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def get_page(self, path):
+        """
+        Return a cached listing page after a 304 Not Modified.
+
+        Args:
+            path: API path of the page, including its query string
+
+        Returns:
+            Listing response dict, or None if the page is not cached
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT body FROM listing_pages WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def put_page(self, path, response, validators):
+        """
+        Store a listing page with its validators (pages without validators are not cached).
+
+        Args:
+            path: API path of the page, including its query string
+            response: Listing response dict
+            validators: (etag, last_modified) of the response, or None
+        """
+        if validators is None:
+            return
+        body = zlib.compress(json.dumps(response, separators=(",", ":")).encode("utf-8"))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO listing_pages (path, body, etag, last_modified, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (path, body, validators[0], validators[1], time.time())
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        """Delete least recently used entries above max_entries (caller holds the lock)."""
+        if not self.max_entries or self.entries <= self.max_entries:
+            return
+
+        # Recent hits must not be evicted as least recently used
+        self._write_accesses()
+        excess = self.entries - self.max_entries
+        self.conn.execute(
+            "DELETE FROM activities WHERE rowid IN"
+            " (SELECT rowid FROM activities ORDER BY accessed_at LIMIT ?)",
+            (excess,)
+        )
+        self.entries -= excess
+        self.evictions += excess
+
+    def _write_accesses(self):
+        """Write the pending access times of cache hits, without committing (caller holds the lock)."""
+        if not self.pending_accesses:
+            return
+        self.conn.executemany(
+            "UPDATE activities SET accessed_at = ? WHERE org_id = ? AND uuid = ?",
+            self.pending_accesses
+        )
+        self.pending_accesses = []
+
+    def close(self):
+        """Write pending access times and close the database (safe to call twice)."""
+        with self.lock:
+            if self.conn is None:
+                return
+            self._write_accesses()
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+
+# Optional audit trail cache used by get_agreement_activities() (see configure_activity_cache)
+_activity_cache = None
+
+
+def configure_activity_cache(path, ttl_days=7.0, max_entries=200000, refresh=False):
+    """
+    Enable the on-disk audit trail cache.
+
+    Args:
+        path: SQLite database file (created if missing)
+        ttl_days: Age in days after which cached entries are revalidated (0 = never expire)
+        max_entries: Maximum number of cached agreements before LRU eviction (0 = unbounded)
+        refresh: Revalidate every entry with a conditional request instead of serving it as-is
+
+    Returns:
+        The ActivityCache instance
+    """
+    global _activity_cache
+
+    _activity_cache = ActivityCache(
+        path,
+        ttl_seconds=ttl_days * 86400,
+        max_entries=max_entries,
+        refresh=refresh
+    )
+    # Keep fetched entries even if the run exits early (e.g., sys.exit in get())
+    atexit.register(_activity_cache.close)
+    return _activity_cache
+
+
+def get_csv_filename(extension="csv"):
+    """
+    Generate Windows-compatible timestamped filename.
+
+    Args:
+        extension: File extension, i.e. the output format (default: "csv")
+
+    Returns:
+        Filename string in format: signed_agreements_execution_time_YYYYMMDD_HHMM.csv
+    """
+    # Use current time for timestamp (no colons for Windows compatibility)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    return f"signed_agreements_execution_time_{timestamp}.{extension}"
+
+
+def get_delta_filename(extension="csv"):
+    """
+    Generate the timestamped filename of a --diff delta file.
+
+    Args:
+        extension: File extension, i.e. the output format (default: "csv")
+
+    Returns:
+        Filename string in format: signed_agreements_execution_time_changes_YYYYMMDD_HHMM.csv
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    return f"signed_agreements_execution_time_changes_{timestamp}.{extension}"
+
+
+def get_shard_filenames(shard_index, shard_count):
+    """
+    Name the files written by one shard of a --shard export.
+
+    Args:
+        shard_index: Shard number, from 1 to shard_count
+        shard_count: Number of shards
+
+    Returns:
+        Tuple of (part filename, summary filename, checkpoint filename)
+    """
+    prefix = f"signed_agreements_execution_time.shard-{shard_index}-of-{shard_count}"
+    return f"{prefix}.jsonl", f"{prefix}.summary.json", f"{prefix}.checkpoint"
+
+
+def get_agreement_shard(agreement_uuid, shard_count):
+    """
+    Assign an agreement to a shard.
+
+    Uses CRC-32 of the uuid rather than hash(), which is randomized per
+    process, so every worker computes the same partition.
+
+    Args:
+        agreement_uuid: Agreement uuid
+        shard_count: Number of shards
+
+    Returns:
+        Shard number, from 1 to shard_count
+    """
+    return zlib.crc32((agreement_uuid or "").encode("utf-8")) % shard_count + 1
+
+
+def get_organizations():
+    """
+    Fetch list of organizations accessible to the authenticated user.
+
+    Returns:
+        List of organization dictionaries with 'id' and 'name' fields
+    """
+    print("Fetching organizations...")
+    response = get("/api/rest/1/user/me/organizations")
+    organizations = response.get("organizations", [])
+
+    if not organizations or len(organizations) == 0:
+        print("WARNING: No organizations found for this API key")
+        return []
+
+    print(f"✓ Found {len(organizations)} organization(s)")
+    return organizations
+
+
+def configure_api(api_key=None, base_url=None):
+    """
+    Override the API key and base URL set at the top of the script.
+
+    Args:
+        api_key: API key (None keeps API_KEY)
+        base_url: API base URL, e.g. a mock server (None keeps BASE_URL)
+    """
+    global API_KEY, BASE_URL
+
+    if api_key:
+        API_KEY = api_key
+    if base_url:
+        BASE_URL = base_url.rstrip("/")
+
+
+def validate_api_key():
+    """
+    Validate that API key has been configured (not placeholder value).
+
+    Exits:
+        Exits with status code 1 if API key is not configured
+    """
+    if not API_KEY or API_KEY == "YOUR_API_KEY_HERE" or API_KEY.strip() == "":
+        print("ERROR: Please set your API_KEY in the script")
+        print("Generate your API key at: https://secure.concordnow.com/#/automations/integrations")
+        print("Then replace 'YOUR_API_KEY_HERE' on line 15 with your actual API key,")
+        print("or set the CONCORD_API_KEY environment variable")
+        sys.exit(1)
+
+
+# Agreements requested per listing page
+AGREEMENTS_PAGE_SIZE = 500
+
+# Listing pages buffered per organization when organizations are listed concurrently
+LISTING_QUEUE_PAGES = 4
+
+
+def get_agreements_page(org_id, page):
+    """
+    Fetch one page of signed agreements for an organization.
+
+    Filters for all "signed" status values using multiple status parameters.
+    Includes all access types (DIRECT, TAG, FOLDER, ORGANIZATION) to get complete list.
+
+    Args:
+        org_id: Organization ID
+        page: Page number (starts at 0)
+
+    Returns:
+        List of agreement dictionaries (empty past the last page)
+    """
+    # Build status filter parameters (all signed statuses)
+    # These map to the "SIGNED" stage in Concord
+    status_params = [
+        "statuses=UNKNOWN_CONTRACT",
+        "statuses=FUTURE_CONTRACT",
+        "statuses=CURRENT_CONTRACT",
+        "statuses=COMPLETED_CONTRACT",
+        "statuses=COMPLETED_CANCEL_CONTRACT",
+        "statuses=COMPLETED_CONTRACT_RENEWABLE"
+    ]
+
+    # Build access type parameters (all types to get complete list)
+    access_params = [
+        "accessType=DIRECT",
+        "accessType=TAG",
+        "accessType=FOLDER",
+        "accessType=ORGANIZATION"
+    ]
+
+    # Construct query string with all parameters
+    query_parts = status_params + access_params + [
+        f"numberOfItemsByPage={AGREEMENTS_PAGE_SIZE}",
+        f"page={page}"
+    ]
+    query_string = "&".join(query_parts)
+
+    print(f"Fetching agreements (page {page})...")
+    path = f"/api/rest/1/user/me/organizations/{org_id}/agreements?{query_string}"
+    with _run_metrics.stage("listing"):
+        if _activity_cache is not None:
+            response = get_revalidated_page(path)
+        else:
+            response = get(path)
+
+    # API returns {"items": [...]} not a direct array
+    items = response.get("items", [])
+    if items:
+        print(f"  Retrieved {len(items)} agreements from page {page}")
+
+    return items
+
+
+def get_revalidated_page(path):
+    """
+    Fetch a listing page, revalidating the cached copy with a conditional request.
+
+    Listing pages are never served from the cache without asking the API,
+    but a 304 Not Modified saves downloading the page again.
+
+    Args:
+        path: API path of the page, including its query string
+
+    Returns:
+        Listing response dict
+    """
+    response, validators = get_conditional(path, _activity_cache.get_page_validators(path))
+    if response is None:
+        response = _activity_cache.get_page(path)
+        if response is not None:
+            _run_metrics.record_cache(path, "not_modified")
+            return response
+        response, validators = get_conditional(path)
+
+    _run_metrics.record_cache(path, "miss")
+    _activity_cache.put_page(path, response, validators)
+    return response
+
+
+def iter_signed_agreement_pages(org_id, prefetch=1):
+    """
+    Yield pages of signed agreements for an organization, in page order.
+
+    With prefetch > 1, the next `prefetch` pages are requested concurrently.
+    Listing stops at the first empty or short page, and requests already
+    sent for later pages are discarded.
+
+    Args:
+        org_id: Organization ID
+        prefetch: Number of page requests kept in flight (1 = one page at a time)
+
+    Yields:
+        Non-empty lists of agreement dictionaries
+    """
+    pages = iter_ordered_results(
+        lambda page: get_agreements_page(org_id, page),
+        itertools.count(),
+        prefetch,
+        window=prefetch
+    )
+
+    try:
+        for items in pages:
+            # Continue after a full page (might be more), an empty or short page is the last one
+            last_page = len(items) < AGREEMENTS_PAGE_SIZE
+            _run_metrics.record_listing_page(len(items), last_page)
+            if not items:
+                break
+
+            yield items
+
+            if last_page:
+                break
+    finally:
+        pages.close()
+
+
+def get_signed_agreements(org_id, prefetch=1):
+    """
+    Fetch paginated list of signed agreements for an organization.
+
+    Uses pagination with numberOfItemsByPage=500. Page numbering starts at 0.
+    Filters for all "signed" status values using multiple status parameters.
+    Includes all access types (DIRECT, TAG, FOLDER, ORGANIZATION) to get complete list.
+
+    Args:
+        org_id: Organization ID
+        prefetch: Number of page requests kept in flight (see iter_signed_agreement_pages)
+
+    Returns:
+        List of agreement dictionaries with uuid, title, status, organizationId fields
+    """
+    all_agreements = []
+    for items in iter_signed_agreement_pages(org_id, prefetch):
+        all_agreements.extend(items)
+    return all_agreements
+
+
+def iter_organization_agreements(organizations, page_prefetch=1, org_workers=1):
+    """
+    Yield the signed agreements of every organization as listing pages arrive.
+
+    With org_workers > 1, up to org_workers organizations are listed
+    concurrently in the background (buffering at most LISTING_QUEUE_PAGES
+    pages each), while agreements are still yielded in organization order
+    and then listing order.
+
+    Args:
+        organizations: List of organization dictionaries
+        page_prefetch: Page requests kept in flight per organization
+        org_workers: Number of organizations listed concurrently
+
+    Yields:
+        (org, agreement) tuples, then (org, None) once an organization's
+        listing is complete
+    """
+    if org_workers <= 1:
+        for org in organizations:
+            for items in iter_signed_agreement_pages(org.get("id"), page_prefetch):
+                for agreement in items:
+                    yield (org, agreement)
+            yield (org, None)
+        return
+
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=LISTING_QUEUE_PAGES) for _ in organizations]
+
+    def put(org_queue, message):
+        # Give up if the consumer has stopped (e.g., after a fatal error)
+        while not stop.is_set():
+            try:
+                org_queue.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def list_organization(org, org_queue):
+        if stop.is_set():
+            return
+        try:
+            for items in iter_signed_agreement_pages(org.get("id"), page_prefetch):
+                if not put(org_queue, ("page", items)):
+                    return
+            put(org_queue, ("done", None))
+        except BaseException as e:
+            # Forward errors (including SystemExit from get()) to the consumer
+            put(org_queue, ("error", e))
+
+    executor = ThreadPoolExecutor(max_workers=org_workers)
+    try:
+        for org, org_queue in zip(organizations, queues):
+            executor.submit(list_organization, org, org_queue)
+
+        for org, org_queue in zip(organizations, queues):
+            while True:
+                kind, value = org_queue.get()
+                if kind == "error":
+                    raise value
+                if kind == "done":
+                    break
+                for agreement in value:
+                    yield (org, agreement)
+            yield (org, None)
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+class AgreementDeduplicator:
+    """
+    Drop agreements whose uuid has already been listed.
+
+    The listing can return the same agreement more than once (through
+    overlapping access types, or when items shift between pages while
+    paging), and an agreement can be visible from several organizations.
+    Only the first occurrence is kept, before any audit trail is fetched.
+    """
+
+    def __init__(self):
+        self.seen = set()
+        self.duplicates = 0
+
+    def filter(self, listed_agreements):
+        """
+        Filter (org, agreement) tuples from iter_organization_agreements().
+
+        Args:
+            listed_agreements: Iterable of (org, agreement) tuples; (org, None)
+                end-of-listing markers are passed through
+
+        Yields:
+            (org, agreement) tuples with previously seen uuids removed
+        """
+        for org, agreement in listed_agreements:
+            if not self.is_duplicate(agreement):
+                yield (org, agreement)
+
+    def is_duplicate(self, agreement):
+        """
+        Check an agreement against the uuids seen so far, and remember it.
+
+        Args:
+            agreement: Agreement dictionary (None for end-of-listing markers)
+
+        Returns:
+            True if the agreement was already listed and should be skipped
+        """
+        if agreement is None:
+            return False
+
+        agreement_uuid = agreement.get("uuid")
+        if agreement_uuid in self.seen:
+            self.duplicates += 1
+            return True
+
+        self.seen.add(agreement_uuid)
+        return False
+
+
+def get_agreement_activities(org_id, agreement_uid):
+    """
+    Fetch audit trail activities for a specific agreement.
+
+    Args:
+        org_id: Organization ID
+        agreement_uid: Agreement UID
+
+    Served from the on-disk cache when one is configured and holds a fresh
+    entry; an expired entry is revalidated with a conditional request.
+
+    Returns:
+        List of activity dictionaries with name, createdAt, and other fields
+        Returns {"activities": [...]} response structure
+    """
+    validators = None
+    if _activity_cache is not None:
+        cached, validators = _activity_cache.get(org_id, agreement_uid)
+        if cached is not None:
+            _run_metrics.record_cache(get_activities_path(org_id, agreement_uid), "hit")
+            return cached
+
+    # Return response (contains {"activities": [...]})
+    return fetch_activities(org_id, agreement_uid, validators)
+
+
+def get_activities_path(org_id, agreement_uid):
+    """Return the API path of an agreement's audit trail."""
+    return f"/api/rest/1/organizations/{org_id}/agreements/{agreement_uid}/activities?type=AUDIT"
+
+
+def fetch_activities(org_id, agreement_uid, validators=None):
+    """
+    Download an audit trail, storing it in the cache if one is configured.
+
+    Only the activities the timeline needs are kept (see
+    parse_activities_stream). An expired cache entry is revalidated: on a
+    304 Not Modified the cached response is reused, so only the headers are
+    transferred.
+
+    Args:
+        org_id: Organization ID
+        agreement_uid: Agreement UID
+        validators: (etag, last_modified) of the expired cache entry, or None
+
+    Returns:
+        {"activities": [...]} response structure
+    """
+    path = get_activities_path(org_id, agreement_uid)
+    response, validators = get_activities(path, validators)
+    if _activity_cache is None:
+        return response
+
+    if response is None:
+        response = _activity_cache.revalidate(org_id, agreement_uid)
+        if response is not None:
+            _run_metrics.record_cache(path, "not_modified")
+            return response
+        # Evicted since the lookup: download it again
+        response, validators = get_activities(path)
+
+    _run_metrics.record_cache(path, "miss")
+    _activity_cache.put(org_id, agreement_uid, response, validators)
+    return response
+
+
+# Activity names counted as approvals and as signatures
+APPROVAL_ACTIVITIES = frozenset(["VALIDATION_ACCEPT"])
+SIGNATURE_ACTIVITIES = frozenset(["NEGOTIATION_APPROVE", "AGREEMENT_SIGNATURE_FINALIZE"])
+
+
+class ActivityBucket:
+    """
+    Running summary of one kind of activity (approvals or signatures).
+
+    Tracks the total count, the earliest and latest non-empty timestamps, and
+    the `limit` earliest activities using a bounded heap, so long audit trails
+    never need to be filtered into lists or sorted.
+    """
+
+    __slots__ = ("limit", "count", "first", "last", "heap")
+
+    def __init__(self, limit=5):
+        self.limit = limit
+        self.count = 0
+        self.first = None
+        self.last = None
+        # Max-heap of (-createdAt, -position, activity) for the `limit` earliest activities
+        self.heap = []
+
+    def add(self, activity, position):
+        """
+        Add one activity.
+
+        Args:
+            activity: Activity dictionary
+            position: Index of the activity in the audit trail (breaks timestamp ties)
+        """
+        self.count += 1
+        timestamp = activity.get("createdAt")
+
+        if timestamp:
+            if self.first is None or timestamp < self.first:
+                self.first = timestamp
+            if self.last is None or timestamp > self.last:
+                self.last = timestamp
+
+        sort_key = activity.get("createdAt", 0)
+        if self.limit is None or len(self.heap) < self.limit:
+            heapq.heappush(self.heap, (-sort_key, -position, activity))
+        elif sort_key < -self.heap[0][0]:
+            # Equal timestamps keep the earlier activity, like a stable sort
+            heapq.heapreplace(self.heap, (-sort_key, -position, activity))
+
+    def earliest(self):
+        """
+        Return the kept activities, earliest first.
+
+        Returns:
+            List of up to `limit` activity dictionaries, in (createdAt, position) order
+        """
+        return [entry[2] for entry in sorted(self.heap, reverse=True)]
+
+
+def classify_activities(activities_response, max_approvers=5, max_signers=5):
+    """
+    Summarize an audit trail in a single pass over its activities.
+
+    Gives the same results as the original extract_* functions (kept in
+    benchmark.py as a reference) combined, without
+    re-filtering and re-sorting the activity list for each of them.
+
+    Args:
+        activities_response: Response dict with "activities" key
+        max_approvers: Number of earliest approvals to keep (None = all)
+        max_signers: Number of earliest signatures to keep (None = all)
+
+    Returns:
+        Tuple of (earliest_activity, earliest_timestamp, approvals, signatures)
+        - earliest_activity: Activity with the smallest createdAt (None if no activities)
+        - earliest_timestamp: Its createdAt, or None if no activity has one
+        - approvals, signatures: ActivityBucket instances
+    """
+    approvals = ActivityBucket(max_approvers)
+    signatures = ActivityBucket(max_signers)
+    earliest_activity = None
+    earliest_timestamp = float('inf')
+
+    add_approval = approvals.add
+    add_signature = signatures.add
+
+    for position, activity in enumerate(activities_response.get("activities", [])):
+        timestamp = activity.get("createdAt", float('inf'))
+        if timestamp < earliest_timestamp or earliest_activity is None:
+            earliest_activity = activity
+            earliest_timestamp = timestamp
+
+        name = activity.get("name")
+        if name in APPROVAL_ACTIVITIES:
+            add_approval(activity, position)
+        elif name in SIGNATURE_ACTIVITIES:
+            add_signature(activity, position)
+
+    if earliest_timestamp == float('inf'):
+        earliest_timestamp = None
+
+    return (earliest_activity, earliest_timestamp, approvals, signatures)
+
+
+class JsonChunkReader:
+    """
+    Incremental reader of a JSON document arriving in chunks of bytes.
+
+    Values are decoded one at a time with JSONDecoder.raw_decode(); when a
+    value runs past the end of the buffer, the next chunk is appended and
+    decoding starts over from the beginning of that value. The consumed part
+    of the buffer is dropped as chunks arrive, so memory holds one chunk and
+    the value being decoded rather than the whole document. Values that are
+    not needed are skipped by skip_value() without decoding them.
+    """
+
+    WHITESPACE = re.compile(r"[ \t\n\r]*")
+    NUMBER = re.compile(r"[-+0-9.eE]*")
+    # Contents of a string up to its closing quote (escapes included), for skip_value()
+    STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+        self.bytes_read = 0
+
+    def _read_more(self):
+        """
+        Append the next chunk to the buffer.
+
+        Returns:
+            False once the document has been read completely
+        """
+        if self.exhausted:
+            return False
+
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            text = self.text_decoder.decode(b"", final=True)
+        else:
+            self.bytes_read += len(chunk)
+            text = self.text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return chunk is not None
+
+    def peek(self):
+        """
+        Skip whitespace and return the next character.
+
+        Returns:
+            The next character, or "" at the end of the document
+        """
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ""
+
+    def consume(self, allowed):
+        """
+        Read one structural character ("{", ",", ":", ...).
+
+        Args:
+            allowed: String of the characters accepted here
+
+        Returns:
+            The character read
+
+        Raises:
+            ValueError: If the next character is not one of `allowed`
+        """
+        char = self.peek()
+        if not char or char not in allowed:
+            raise ValueError(f"Expected one of '{allowed}' but found '{char}' after {self.bytes_read} bytes")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Decode the next JSON value.
+
+        Returns:
+            The decoded value
+
+        Raises:
+            ValueError: If the value is not valid JSON
+        """
+        char = self.peek()
+        if char and char in "-0123456789":
+            # A number may continue in the next chunk (raw_decode would stop
+            # early, e.g. at "1." or "1e"): read up to the character after it
+            while self.NUMBER.match(self.buffer, self.pos).end() == len(self.buffer):
+                if not self._read_more():
+                    break
+
+        while True:
+            try:
+                value, self.pos = self.decoder.raw_decode(self.buffer, self.pos)
+                return value
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+
+    def skip_value(self):
+        """
+        Skip the next JSON value without decoding it.
+
+        Objects, arrays and strings are scanned for their end, tracking the
+        nesting depth and string escapes across chunks, so skipping a value
+        reads it once whatever its size (decoding it with value() would start
+        over at every chunk). Scalars are decoded with value(). The contents
+        of the skipped value are not validated.
+
+        Raises:
+            ValueError: If the document ends inside the value
+        """
+        char = self.peek()
+        if not char or char not in '{["':
+            self.value()
+            return
+
+        depth = 0
+        in_string = False
+        while True:
+            if in_string:
+                # Up to the closing quote, or to the end of the buffer (or a
+                # backslash whose escaped character is in the next chunk)
+                end = self.STRING_BODY.match(self.buffer, self.pos).end()
+                if end < len(self.buffer) and self.buffer[end] == '"':
+                    self.pos = end + 1
+                    in_string = False
+                    if depth == 0:
+                        return
+                    continue
+                self.pos = end
+            else:
+                # Brackets are counted in bulk up to the next string
+                quote = self.buffer.find('"', self.pos)
+                end = quote if quote >= 0 else len(self.buffer)
+                segment = self.buffer[self.pos:end]
+                opened = segment.count("[") + segment.count("{")
+                closed = segment.count("]") + segment.count("}")
+                if closed >= depth:
+                    # The value may end in this segment: walk it to find out
+                    for offset, char in enumerate(segment):
+                        if char in "[{":
+                            depth += 1
+                        elif char in "]}":
+                            depth -= 1
+                            if depth == 0:
+                                self.pos += offset + 1
+                                return
+                else:
+                    depth += opened - closed
+                if quote >= 0:
+                    self.pos = quote + 1
+                    in_string = True
+                    continue
+                self.pos = end
+
+            # The rest of the buffer has been scanned: drop it and read on
+            if not self._read_more():
+                raise ValueError(f"Unterminated JSON value after {self.bytes_read} bytes")
+
+
+def reduce_activity(activity):
+    """
+    Keep only the fields of an activity that the timeline uses.
+
+    Args:
+        activity: Activity dictionary from the audit trail
+
+    Returns:
+        Dictionary with name, createdAt (if present) and creator.actor.email (if present)
+    """
+    reduced = {"name": activity.get("name")}
+    if "createdAt" in activity:
+        reduced["createdAt"] = activity["createdAt"]
+    actor = (activity.get("creator") or {}).get("actor") or {}
+    if "email" in actor:
+        reduced["creator"] = {"actor": {"email": actor["email"]}}
+    return reduced
+
+
+def parse_activities_stream(chunks):
+    """
+    Parse an audit trail response incrementally, keeping only what the timeline needs.
+
+    Activities are decoded one at a time. Approvals and signatures are kept,
+    plus the earliest activity (the creation), each reduced to name, createdAt
+    and creator email (see reduce_activity). Kept activities stay in audit
+    trail order, so build_timeline() gives the same result as with the full
+    response. Other top-level fields are skipped.
+
+    Args:
+        chunks: Iterable of bytes chunks of the response body
+
+    Returns:
+        Tuple of ({"activities": [...]} reduced response, body size in bytes)
+
+    Raises:
+        ValueError: If the body is not a valid JSON object
+        requests.exceptions.RequestException: If reading a chunk fails
+    """
+    reader = JsonChunkReader(chunks)
+    kept = []
+
+    reader.consume("{")
+    if reader.peek() == "}":
+        reader.consume("}")
+        return {"activities": kept}, reader.bytes_read
+
+    while True:
+        key = reader.value()
+        reader.consume(":")
+        if key != "activities" or reader.peek() != "[":
+            # Fields the timeline does not use (or an empty "activities": null)
+            reader.skip_value()
+        else:
+            reader.consume("[")
+            if reader.peek() == "]":
+                reader.consume("]")
+            else:
+                kept = _read_relevant_activities(reader)
+        if reader.consume(",}") == "}":
+            return {"activities": kept}, reader.bytes_read
+
+
+def _read_relevant_activities(reader):
+    """Read the elements of the "activities" array (see parse_activities_stream)."""
+    kept = []
+    # Earliest activity so far (as decoded), and where to insert it if it is not kept otherwise
+    earliest = None
+    earliest_timestamp = float('inf')
+    earliest_index = None
+
+    while True:
+        activity = reader.value()
+        if not isinstance(activity, dict):
+            raise ValueError(f"Expected an activity object, found {type(activity).__name__}")
+        name = activity.get("name")
+        reduced = None
+        if name in APPROVAL_ACTIVITIES or name in SIGNATURE_ACTIVITIES:
+            reduced = reduce_activity(activity)
+            kept.append(reduced)
+
+        # Same rule as classify_activities: the first activity with the smallest createdAt
+        timestamp = activity.get("createdAt", float('inf'))
+        if earliest is None or timestamp < earliest_timestamp:
+            earliest_timestamp = timestamp
+            earliest = activity
+            earliest_index = None if reduced is not None else len(kept)
+
+        if reader.consume(",]") == "]":
+            break
+
+    if earliest_index is not None:
+        # Reduced once, as it may be superseded many times during the scan
+        kept.insert(earliest_index, reduce_activity(earliest))
+    return kept
+
+
+def construct_agreement_url(org_id, agreement_uuid):
+    """
+    Build web URL for viewing agreement in Concord interface.
+
+    Args:
+        org_id: Organization ID
+        agreement_uuid: Agreement UUID
+
+    Returns:
+        Full web URL string
+    """
+    return f"https://secure.concordnow.com/#/organizations/{org_id}/agreements/{agreement_uuid}"
+
+
+# Timeline keys (see get_csv_columns) of the single-valued TimelineRecord fields
+TIMELINE_KEY_ATTRIBUTES = {
+    "agreementId": "agreement_id",
+    "agreementTitle": "agreement_title",
+    "agreementLink": "agreement_link",
+    "creationDate": "creation_date",
+    "createdBy": "created_by",
+    "firstApprovalDate": "first_approval_date",
+    "lastApprovalDate": "last_approval_date",
+    "firstSignatureDate": "first_signature_date",
+    "lastSignatureDate": "last_signature_date",
+    "totalApprovals": "total_approvals",
+    "totalSignatures": "total_signatures",
+}
+
+# Numbered timeline keys: prefix -> (TimelineRecord attribute, index in the (email, timestamp) pair)
+TIMELINE_PAIR_KEYS = {
+    "approver": ("approvals", 0),
+    "approvalDate": ("approvals", 1),
+    "signer": ("signatures", 0),
+    "signatureDate": ("signatures", 1),
+}
+
+_NUMBERED_KEY = re.compile(r"(approver|approvalDate|signer|signatureDate)([1-9][0-9]*)$")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_timeline_key(key):
+    """Resolve a timeline key to (attribute, pair index, position), or None if unknown."""
+    attribute = TIMELINE_KEY_ATTRIBUTES.get(key)
+    if attribute is not None:
+        return attribute, None, None
+    match = _NUMBERED_KEY.match(key)
+    if match is None:
+        return None
+    attribute, position = TIMELINE_PAIR_KEYS[match.group(1)]
+    return attribute, int(match.group(2)) - 1, position
+
+
+@functools.lru_cache(maxsize=64)
+def _standard_column_counts(keys):
+    """Return (approver, signer) column counts if keys are in get_csv_columns() order, else None."""
+    max_approvers = sum(1 for key in keys if key.startswith("approvalDate"))
+    max_signers = sum(1 for key in keys if key.startswith("signatureDate"))
+    standard_keys = tuple(key for _, key in get_csv_columns(max_approvers, max_signers))
+    return (max_approvers, max_signers) if keys == standard_keys else None
+
+
+class TimelineRecord:
+    """
+    Timeline of one agreement: one row of the export.
+
+    Approvals and signatures are tuples of (email, timestamp) pairs, earliest
+    first, holding only the approvals/signatures kept for the columns (the
+    writers pad them to their column count). All dates are Unix millisecond
+    timestamps, or None, until an output writer formats them. Rows are
+    addressed by the timeline keys of get_csv_columns() through get() and
+    values(); to_dict() and from_dict() convert to and from the keyed form
+    stored in JSON files (checkpoint, shard parts) and read back by
+    read_timelines().
+    """
+
+    __slots__ = (
+        "agreement_id", "agreement_title", "agreement_link", "creation_date", "created_by",
+        "approvals", "signatures",
+        "first_approval_date", "last_approval_date", "first_signature_date", "last_signature_date",
+        "total_approvals", "total_signatures", "events",
+    )
+
+    def __init__(self, agreement_id="", agreement_title="", agreement_link="", creation_date=None,
+                 created_by="", approvals=(), signatures=(), first_approval_date=None,
+                 last_approval_date=None, first_signature_date=None, last_signature_date=None,
+                 total_approvals=0, total_signatures=0, events=None):
+        self.agreement_id = agreement_id
+        self.agreement_title = agreement_title
+        self.agreement_link = agreement_link
+        self.creation_date = creation_date
+        self.created_by = created_by
+        self.approvals = approvals
+        self.signatures = signatures
+        self.first_approval_date = first_approval_date
+        self.last_approval_date = last_approval_date
+        self.first_signature_date = first_signature_date
+        self.last_signature_date = last_signature_date
+        self.total_approvals = total_approvals
+        self.total_signatures = total_signatures
+        # Every approval and signature, for --store (see build_timeline)
+        self.events = events
+
+    def __eq__(self, other):
+        if not isinstance(other, TimelineRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"TimelineRecord({self.agreement_id!r}, {self.agreement_title!r})"
+
+    def get(self, key, default=None):
+        """
+        Look up a value by timeline key, like the keyed timeline dictionary.
+
+        Args:
+            key: Timeline key, e.g. "creationDate" or "approver2" (see get_csv_columns)
+            default: Value for unknown keys and approvers/signers beyond the kept ones
+
+        Returns:
+            The value (dates as Unix millisecond timestamps)
+        """
+        parsed = _parse_timeline_key(key)
+        if parsed is None:
+            return default
+        attribute, index, position = parsed
+        value = getattr(self, attribute)
+        if index is None:
+            return value
+        return value[index][position] if index < len(value) else default
+
+    def values(self, keys):
+        """
+        Return the raw values of a row, in column order.
+
+        Args:
+            keys: Timeline keys in column order (see get_csv_columns)
+
+        Returns:
+            List of values, with None for missing values and unformatted timestamps
+        """
+        counts = _standard_column_counts(tuple(keys))
+        if counts is None:
+            return [self.get(key) for key in keys]
+
+        max_approvers, max_signers = counts
+        approvals = self.approvals[:max_approvers]
+        signatures = self.signatures[:max_signers]
+        row = [self.agreement_id, self.agreement_title, self.agreement_link, self.creation_date, self.created_by]
+        for pair in approvals:
+            row.extend(pair)
+        row.extend(("", None) * (max_approvers - len(approvals)))
+        for pair in signatures:
+            row.extend(pair)
+        row.extend(("", None) * (max_signers - len(signatures)))
+        row.extend((
+            self.first_approval_date, self.last_approval_date,
+            self.first_signature_date, self.last_signature_date,
+            self.total_approvals, self.total_signatures,
+        ))
+        return row
+
+    def to_dict(self):
+        """
+        Convert to the keyed timeline dictionary (JSON-serializable).
+
+        Returns:
+            Dictionary keyed by timeline key, with one approver/signer pair per
+            kept approval/signature, plus "events" when they were collected
+        """
+        result = {
+            "agreementId": self.agreement_id,
+            "agreementTitle": self.agreement_title,
+            "agreementLink": self.agreement_link,
+            "creationDate": self.creation_date,
+            "createdBy": self.created_by,
+        }
+        for i, (email, timestamp) in enumerate(self.approvals, start=1):
+            result[f"approver{i}"] = email
+            result[f"approvalDate{i}"] = timestamp
+        for i, (email, timestamp) in enumerate(self.signatures, start=1):
+            result[f"signer{i}"] = email
+            result[f"signatureDate{i}"] = timestamp
+        result["firstApprovalDate"] = self.first_approval_date
+        result["lastApprovalDate"] = self.last_approval_date
+        result["firstSignatureDate"] = self.first_signature_date
+        result["lastSignatureDate"] = self.last_signature_date
+        result["totalApprovals"] = self.total_approvals
+        result["totalSignatures"] = self.total_signatures
+        if self.events is not None:
+            result["events"] = self.events
+        return result
+
+    @classmethod
+    def from_dict(cls, timeline):
+        """
+        Build a record from a keyed timeline dictionary (see to_dict).
+
+        Args:
+            timeline: Dictionary keyed by timeline key (dates as Unix millisecond
+                timestamps); approver/signer pairs are read until the first missing
+                number, and empty trailing pairs (column padding) are dropped
+
+        Returns:
+            TimelineRecord instance
+        """
+        def pairs(email_prefix, date_prefix):
+            result = []
+            i = 1
+            while f"{email_prefix}{i}" in timeline or f"{date_prefix}{i}" in timeline:
+                result.append((timeline.get(f"{email_prefix}{i}") or "", timeline.get(f"{date_prefix}{i}")))
+                i += 1
+            while result and result[-1] == ("", None):
+                result.pop()
+            return tuple(result)
+
+        return cls(
+            agreement_id=timeline.get("agreementId", ""),
+            agreement_title=timeline.get("agreementTitle", ""),
+            agreement_link=timeline.get("agreementLink", ""),
+            creation_date=timeline.get("creationDate"),
+            created_by=timeline.get("createdBy", ""),
+            approvals=pairs("approver", "approvalDate"),
+            signatures=pairs("signer", "signatureDate"),
+            first_approval_date=timeline.get("firstApprovalDate"),
+            last_approval_date=timeline.get("lastApprovalDate"),
+            first_signature_date=timeline.get("firstSignatureDate"),
+            last_signature_date=timeline.get("lastSignatureDate"),
+            total_approvals=timeline.get("totalApprovals", 0),
+            total_signatures=timeline.get("totalSignatures", 0),
+            events=timeline.get("events"),
+        )
+
+    def to_list(self):
+        """Convert to a compact JSON-serializable list (see from_list), for temporary files."""
+        return [
+            self.agreement_id, self.agreement_title, self.agreement_link, self.creation_date, self.created_by,
+            self.approvals, self.signatures,
+            self.first_approval_date, self.last_approval_date, self.first_signature_date, self.last_signature_date,
+            self.total_approvals, self.total_signatures,
+        ]
+
+    @classmethod
+    def from_list(cls, values):
+        """Build a record from the output of to_list() after a JSON round trip."""
+        record = cls(*values)
+        record.approvals = tuple(map(tuple, record.approvals))
+        record.signatures = tuple(map(tuple, record.signatures))
+        return record
+
+
+def process_agreement(org_id, agreement, max_participants=5, include_events=False):
+    """
+    Process a single agreement to extract all timeline data.
+
+    Orchestrates: fetch activities, build the timeline record
+    (see build_timeline), and warn when approvals or signatures are truncated.
+
+    Args:
+        org_id: Organization ID
+        agreement: Agreement dictionary with uuid, title fields
+        max_participants: Approvers and signers to keep (None = all of them)
+        include_events: Add every approval and signature to the timeline (see build_timeline)
+
+    Returns:
+        TimelineRecord for CSV export (see build_timeline)
+    """
+    agreement_title = agreement.get("title", "")
+
+    # Fetch audit trail activities
+    with _run_metrics.stage("fetch"):
+        activities_response = get_agreement_activities(org_id, agreement.get("uuid"))
+
+    with _run_metrics.stage("extract"), profile_stage("extract"):
+        timeline = build_timeline(
+            org_id,
+            agreement,
+            activities_response,
+            max_approvers=max_participants,
+            max_signers=max_participants,
+            include_events=include_events
+        )
+
+    # Print warnings if approvals or signatures were truncated
+    if max_participants is not None:
+        total_approvals = timeline.total_approvals
+        total_signatures = timeline.total_signatures
+        if total_approvals > max_participants:
+            log_warning(
+                "truncated",
+                f"Agreement '{agreement_title[:50]}' has {total_approvals} approvals (showing first {max_participants})",
+                uuid=agreement.get("uuid"),
+                approvals=total_approvals
+            )
+        if total_signatures > max_participants:
+            log_warning(
+                "truncated",
+                f"Agreement '{agreement_title[:50]}' has {total_signatures} signatures (showing first {max_participants})",
+                uuid=agreement.get("uuid"),
+                signatures=total_signatures
+            )
+
+    return timeline
+
+
+def build_timeline(org_id, agreement, activities_response, max_approvers=5, max_signers=5,
+                   include_events=False):
+    """
+    Build the timeline record of an agreement from its audit trail.
+
+    Extracts creation/approval/signature dates in a single pass over the
+    activities (see classify_activities) and constructs the agreement URL.
+
+    Args:
+        org_id: Organization ID
+        agreement: Agreement dictionary with uuid, title fields
+        activities_response: Response dict with "activities" key
+        max_approvers: Number of approver columns to fill (None = one per approval)
+        max_signers: Number of signer columns to fill (None = one per signature)
+        include_events: Also list every approval and signature in events
+
+    Returns:
+        TimelineRecord with all timeline fields for export (dates are Unix
+        millisecond timestamps, or None, formatted by the output writer):
+        - agreement_id, agreement_title, agreement_link
+        - creation_date, created_by
+        - approvals, signatures: (email, timestamp) pairs, earliest first,
+          at most max_approvers/max_signers of them
+        - first/last_approval_date, first/last_signature_date (backward compatibility)
+        - total_approvals, total_signatures
+        - events (with include_events): list of {"kind", "activity", "email",
+          "createdAt"} dicts, approvals then signatures, earliest first
+    """
+    agreement_uuid = agreement.get("uuid")
+    agreement_title = agreement.get("title", "")
+
+    # Extract all timeline data in one pass (keeping every activity for events)
+    earliest_activity, earliest_timestamp, approvals, signatures = classify_activities(
+        activities_response,
+        max_approvers=None if include_events else max_approvers,
+        max_signers=None if include_events else max_signers
+    )
+
+    creation_date = valid_timestamp(earliest_timestamp)
+    created_by = ""
+    if earliest_activity is not None:
+        created_by = earliest_activity.get("creator", {}).get("actor", {}).get("email", "")
+
+    total_approvals = approvals.count
+    total_signatures = signatures.count
+
+    # Construct web URL
+    agreement_link = construct_agreement_url(org_id, agreement_uuid)
+
+    # Keep (email, timestamp) of the approvals/signatures shown in the columns
+    detailed_approvals = approvals.earliest()
+    detailed_signatures = signatures.earliest()
+    approval_pairs = tuple(
+        (activity.get("creator", {}).get("actor", {}).get("email", ""), valid_timestamp(activity.get("createdAt")))
+        for activity in detailed_approvals[:max_approvers]
+    )
+    signature_pairs = tuple(
+        (activity.get("creator", {}).get("actor", {}).get("email", ""), valid_timestamp(activity.get("createdAt")))
+        for activity in detailed_signatures[:max_signers]
+    )
+
+    result = TimelineRecord(
+        agreement_id=agreement_uuid,
+        agreement_title=agreement_title,
+        agreement_link=agreement_link,
+        creation_date=creation_date,
+        created_by=created_by,
+        approvals=approval_pairs,
+        signatures=signature_pairs,
+        first_approval_date=valid_timestamp(approvals.first),
+        last_approval_date=valid_timestamp(approvals.last),
+        first_signature_date=valid_timestamp(signatures.first),
+        last_signature_date=valid_timestamp(signatures.last),
+        total_approvals=total_approvals,
+        total_signatures=total_signatures,
+    )
+
+    # Add every approval and signature, not limited to the columns above
+    if include_events:
+        result.events = [
+            {
+                "kind": kind,
+                "activity": activity.get("name"),
+                "email": activity.get("creator", {}).get("actor", {}).get("email", ""),
+                "createdAt": valid_timestamp(activity.get("createdAt")),
+            }
+            for kind, activities in (("approval", detailed_approvals), ("signature", detailed_signatures))
+            for activity in activities
+        ]
+
+    return result
+
+
+def get_csv_columns(max_approvers=5, max_signers=5):
+    """
+    Describe the CSV columns as (header, timeline key) pairs.
+
+    With the defaults this gives the 31 columns of the export:
+    - Agreement ID, Title, Link, Creation Date, Created By
+    - Approver 1-5, Approval Date 1-5 (10 columns)
+    - Signer 1-5, Signature Date 1-5 (10 columns)
+    - First Approval Date, Last Approval Date (backward compatibility)
+    - First Signature Date, Last Signature Date (backward compatibility)
+    - Total Approvals, Total Signatures
+
+    Args:
+        max_approvers: Number of approver/approval date column pairs
+        max_signers: Number of signer/signature date column pairs
+
+    Returns:
+        List of (header, key) tuples in column order
+    """
+    # Columns 1-5: Basics
+    columns = [
+        ("Agreement ID", "agreementId"),
+        ("Agreement Title", "agreementTitle"),
+        ("Agreement Link", "agreementLink"),
+        ("Creation Date", "creationDate"),
+        ("Created By", "createdBy"),
+    ]
+
+    # Columns 6-15: Detailed approvals
+    for i in range(1, max_approvers + 1):
+        columns.append((f"Approver {i}", f"approver{i}"))
+        columns.append((f"Approval Date {i}", f"approvalDate{i}"))
+
+    # Columns 16-25: Detailed signatures
+    for i in range(1, max_signers + 1):
+        columns.append((f"Signer {i}", f"signer{i}"))
+        columns.append((f"Signature Date {i}", f"signatureDate{i}"))
+
+    # Columns 26-31: Backward compatibility and totals
+    columns.extend([
+        ("First Approval Date", "firstApprovalDate"),
+        ("Last Approval Date", "lastApprovalDate"),
+        ("First Signature Date", "firstSignatureDate"),
+        ("Last Signature Date", "lastSignatureDate"),
+        ("Total Approvals", "totalApprovals"),
+        ("Total Signatures", "totalSignatures"),
+    ])
+
+    return columns
+
+
+# Supported --format values: base format plus optional compression suffix
+OUTPUT_FORMATS = ["csv", "csv.gz", "csv.zst", "jsonl", "jsonl.gz", "jsonl.zst", "parquet", "arrow"]
+
+# Rows buffered per record batch by the Parquet/Arrow writer
+ARROW_BATCH_ROWS = 10000
+
+
+def is_timestamp_key(key):
+    """
+    Tell whether a timeline key holds a Unix millisecond timestamp.
+
+    Args:
+        key: Timeline key (see get_csv_columns)
+
+    Returns:
+        True for creationDate, approvalDate<N>, signatureDate<N> and the first/last dates
+    """
+    return key.endswith("Date") or key.startswith("approvalDate") or key.startswith("signatureDate")
+
+
+def is_count_key(key):
+    """
+    Tell whether a timeline key holds an integer count.
+
+    Args:
+        key: Timeline key (see get_csv_columns)
+
+    Returns:
+        True for totalApprovals and totalSignatures
+    """
+    return key.startswith("total")
+
+
+@functools.lru_cache(maxsize=64)
+def _csv_row_layout(keys):
+    """Split column positions into (timestamp positions, other positions) for a tuple of keys."""
+    timestamp_positions = tuple(i for i, key in enumerate(keys) if is_timestamp_key(key))
+    other_positions = tuple(i for i, key in enumerate(keys) if not is_timestamp_key(key))
+    return timestamp_positions, other_positions
+
+
+def format_csv_row(timeline, keys):
+    """
+    Build the CSV values of a timeline.
+
+    Args:
+        timeline: TimelineRecord (see build_timeline)
+        keys: Timeline keys in column order
+
+    Returns:
+        List of values, with timestamps as "YYYY-MM-DD HH:MM:SS" strings
+    """
+    keys = tuple(keys)
+    row = timeline.values(keys)
+    timestamp_positions, other_positions = _csv_row_layout(keys)
+
+    # All dates of the row are formatted in one batch
+    dates = unix_ms_to_utc_strings([row[i] for i in timestamp_positions])
+    for position, value in zip(timestamp_positions, dates):
+        row[position] = value
+    for position in other_positions:
+        if row[position] is None:
+            row[position] = ""
+    return row
+
+
+def import_optional(module_name, package, purpose):
+    """
+    Import an optional dependency, exiting with install instructions if missing.
+
+    Args:
+        module_name: Module to import (e.g., "pyarrow.parquet")
+        package: pip package providing it
+        purpose: Feature needing it, for the error message
+
+    Returns:
+        The imported module
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        print(f"ERROR: {purpose} requires the {package} package (pip install {package})")
+        sys.exit(1)
+
+
+def check_output_format(output_format):
+    """
+    Fail before exporting if the output format needs a package that is not installed.
+
+    Args:
+        output_format: One of OUTPUT_FORMATS
+    """
+    if output_format in ("parquet", "arrow"):
+        import_optional("pyarrow.parquet", "pyarrow", f"{output_format.capitalize()} output")
+    if output_format.endswith(".zst"):
+        import_optional("zstandard", "zstandard", "zstd output")
+
+
+def open_text_output(filename, compression=None):
+    """
+    Open a text file for writing, optionally compressed.
+
+    Args:
+        filename: File to create
+        compression: None, "gz" (gzip) or "zst" (zstd, needs the zstandard package)
+
+    Returns:
+        Writable text file object
+    """
+    if compression == "gz":
+        return gzip.open(filename, 'wt', newline='', encoding='utf-8')
+
+    if compression == "zst":
+        zstandard = import_optional("zstandard", "zstandard", "zstd output")
+        stream = zstandard.ZstdCompressor().stream_writer(open(filename, 'wb'))
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    return open(filename, 'w', newline='', encoding='utf-8')
+
+
+def open_text_input(filename):
+    """
+    Open a text file for reading, decompressing .gz and .zst files.
+
+    Args:
+        filename: File to read
+
+    Returns:
+        Readable text file object
+    """
+    if filename.endswith(".gz"):
+        return gzip.open(filename, 'rt', newline='', encoding='utf-8')
+
+    if filename.endswith(".zst"):
+        zstandard = import_optional("zstandard", "zstandard", "Reading zstd files")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'))
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    return open(filename, newline='', encoding='utf-8')
+
+
+class TimelineFileWriter:
+    """
+    Base class for streaming timeline rows to an output file.
+
+    Rows go to a temporary "<filename>.part" file that is renamed to the
+    final name by close(), so readers never see a partial export. The file is
+    only created when the first row is written (or by ensure_open()).
+    Subclasses implement _open(), _write() and _close().
+    """
+
+    # Name of the format in console messages
+    label = "Output"
+
+    def __init__(self, filename, columns=None):
+        self.filename = filename
+        self.columns = columns or get_csv_columns()
+        self.keys = [key for _, key in self.columns]
+        self.temp_filename = f"{filename}.part"
+        self.opened = False
+        self.rows_written = 0
+
+    def write(self, timeline):
+        """
+        Append one timeline.
+
+        Args:
+            timeline: TimelineRecord (see build_timeline)
+        """
+        self.ensure_open()
+        try:
+            self._write(timeline)
+            self.rows_written += 1
+        except IOError as e:
+            print(f"ERROR: Failed to write {self.label} file: {e}")
+            sys.exit(1)
+
+    def ensure_open(self):
+        """Create the temporary file if no row was written yet, so close() writes a file without rows."""
+        if self.opened:
+            return
+        try:
+            self._open()
+            self.opened = True
+        except IOError as e:
+            print(f"ERROR: Failed to write {self.label} file: {e}")
+            sys.exit(1)
+
+    def close(self):
+        """
+        Finish the export by moving the temporary file to its final name.
+
+        Returns:
+            True if a file was written, False if no rows were written
+        """
+        if not self.opened:
+            return False
+
+        try:
+            self._close()
+            self.opened = False
+            os.replace(self.temp_filename, self.filename)
+        except (IOError, OSError) as e:
+            print(f"ERROR: Failed to write {self.label} file: {e}")
+            sys.exit(1)
+
+        print(f"✓ {self.label} file written: {self.filename}")
+        return True
+
+    def abort(self):
+        """Discard the temporary file of an unfinished export (safe to call after close)."""
+        if not self.opened:
+            return
+        self.opened = False
+        try:
+            self._close()
+        finally:
+            os.remove(self.temp_filename)
+
+
+class CsvTimelineWriter(TimelineFileWriter):
+    """
+    Stream timeline rows to a (optionally gzip/zstd compressed) CSV file.
+
+    Dates are formatted as "YYYY-MM-DD HH:MM:SS" UTC strings. The file is
+    flushed every FLUSH_INTERVAL rows.
+    """
+
+    label = "CSV"
+    FLUSH_INTERVAL = 100
+
+    def __init__(self, filename, columns=None, compression=None):
+        super().__init__(filename, columns)
+        self.compression = compression
+        self.file = None
+        self.writer = None
+
+    def _open(self):
+        """Create the temporary file and write the header row."""
+        self.file = open_text_output(self.temp_filename, self.compression)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([header for header, _ in self.columns])
+
+    def _write(self, timeline):
+        self.writer.writerow(format_csv_row(timeline, self.keys))
+        if (self.rows_written + 1) % self.FLUSH_INTERVAL == 0:
+            self.file.flush()
+
+    def _close(self):
+        self.file.close()
+        self.file = None
+
+
+class JsonLinesTimelineWriter(TimelineFileWriter):
+    """
+    Stream timelines to a (optionally gzip/zstd compressed) JSON Lines file.
+
+    Each line is one object keyed by timeline key (e.g. "approvalDate1"), with
+    dates as ISO 8601 UTC strings, counts as integers and missing values as null.
+    """
+
+    label = "JSON Lines"
+    FLUSH_INTERVAL = 100
+
+    def __init__(self, filename, columns=None, compression=None):
+        super().__init__(filename, columns)
+        self.compression = compression
+        self.file = None
+
+    def _open(self):
+        self.file = open_text_output(self.temp_filename, self.compression)
+
+    def _write(self, timeline):
+        record = {}
+        for key, value in zip(self.keys, timeline.values(self.keys)):
+            if is_timestamp_key(key):
+                value = unix_ms_to_iso_string(value)
+            elif value == "":
+                value = None
+            record[key] = value
+
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if (self.rows_written + 1) % self.FLUSH_INTERVAL == 0:
+            self.file.flush()
+
+    def _close(self):
+        self.file.close()
+        self.file = None
+
+
+class ArrowTimelineWriter(TimelineFileWriter):
+    """
+    Stream timelines to a Parquet or Arrow IPC file (needs the pyarrow package).
+
+    Columns are named by timeline key, with dates as timestamp[ms, UTC],
+    counts as int32 and text as string. Rows are buffered and written in
+    record batches of ARROW_BATCH_ROWS.
+    """
+
+    def __init__(self, filename, columns=None, file_format="parquet"):
+        super().__init__(filename, columns)
+        self.file_format = file_format
+        self.label = "Parquet" if file_format == "parquet" else "Arrow"
+        self.pa = None
+        self.schema = None
+        self.writer = None
+        self.buffer = {key: [] for key in self.keys}
+        self.buffered = 0
+
+    def _open(self):
+        parquet = import_optional("pyarrow.parquet", "pyarrow", f"{self.label} output")
+        pa = self.pa = import_optional("pyarrow", "pyarrow", f"{self.label} output")
+        fields = []
+        for key in self.keys:
+            if is_timestamp_key(key):
+                fields.append(pa.field(key, pa.timestamp("ms", tz="UTC")))
+            elif is_count_key(key):
+                fields.append(pa.field(key, pa.int32()))
+            else:
+                fields.append(pa.field(key, pa.string()))
+        self.schema = pa.schema(fields)
+
+        if self.file_format == "parquet":
+            self.writer = parquet.ParquetWriter(self.temp_filename, self.schema, compression="zstd")
+        else:
+            self.writer = pa.ipc.new_file(self.temp_filename, self.schema)
+
+    def _write(self, timeline):
+        for key, value in zip(self.keys, timeline.values(self.keys)):
+            if value == "" and not is_timestamp_key(key) and not is_count_key(key):
+                value = None
+            self.buffer[key].append(value)
+
+        self.buffered += 1
+        if self.buffered >= ARROW_BATCH_ROWS:
+            self._flush_batch()
+
+    def _flush_batch(self):
+        """Write buffered rows as one record batch."""
+        if not self.buffered:
+            return
+        arrays = [
+            self.pa.array(self.buffer[field.name], type=field.type)
+            for field in self.schema
+        ]
+        self.writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.buffer = {key: [] for key in self.keys}
+        self.buffered = 0
+
+    def _close(self):
+        self._flush_batch()
+        self.writer.close()
+        self.writer = None
+
+
+def create_timeline_writer(filename, output_format="csv", columns=None):
+    """
+    Create the writer for an output format.
+
+    Args:
+        filename: Output filename
+        output_format: One of OUTPUT_FORMATS
+        columns: (header, key) pairs (default: get_csv_columns())
+
+    Returns:
+        TimelineFileWriter instance
+    """
+    base_format, _, compression = output_format.partition(".")
+    compression = compression or None
+
+    if base_format == "csv":
+        return CsvTimelineWriter(filename, columns, compression=compression)
+    if base_format == "jsonl":
+        return JsonLinesTimelineWriter(filename, columns, compression=compression)
+    return ArrowTimelineWriter(filename, columns, file_format=base_format)
+
+
+class AutoWidthTimelineWriter:
+    """
+    Stream timeline rows to an output file sized to the largest agreement.
+
+    The number of approver/signer columns is only known once every agreement
+    has been processed, so rows are spooled to a temporary file (kept in
+    memory up to SPOOL_MEMORY_BYTES) while the maximum counts are tracked.
+    close() then creates the real writer and copies the rows in a second pass.
+    """
+
+    SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, filename, output_format="csv"):
+        self.filename = filename
+        self.output_format = output_format
+        self.spool = tempfile.SpooledTemporaryFile(
+            max_size=self.SPOOL_MEMORY_BYTES, mode='w+', encoding='utf-8'
+        )
+        self.max_approvers = 0
+        self.max_signers = 0
+        self.rows_written = 0
+
+    def write(self, timeline):
+        """
+        Spool one timeline and update the column counts.
+
+        Args:
+            timeline: TimelineRecord (see build_timeline)
+        """
+        self.max_approvers = max(self.max_approvers, int(timeline.total_approvals or 0))
+        self.max_signers = max(self.max_signers, int(timeline.total_signatures or 0))
+        self.spool.write(json.dumps(timeline.to_list()) + "\n")
+        self.rows_written += 1
+
+    def close(self):
+        """
+        Write the output file from the spooled rows.
+
+        Returns:
+            True if a file was written, False if no rows were written
+        """
+        if self.spool is None or self.rows_written == 0:
+            self.abort()
+            return False
+
+        writer = create_timeline_writer(
+            self.filename,
+            self.output_format,
+            get_csv_columns(self.max_approvers, self.max_signers)
+        )
+        self.spool.seek(0)
+        for line in self.spool:
+            writer.write(TimelineRecord.from_list(json.loads(line)))
+        self.abort()
+
+        print(f"  Approver columns: {self.max_approvers}, signer columns: {self.max_signers}")
+        return writer.close()
+
+    def abort(self):
+        """Discard the spooled rows (safe to call after close)."""
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+
+
+class ShardPartWriter(TimelineFileWriter):
+    """
+    Stream the timelines of one --shard worker to its part file.
+
+    Each JSON line holds the agreement's position in the full listing
+    ("index"), its organization name ("org") and the timeline with Unix
+    millisecond dates, so merge_shard_outputs() can interleave the parts back
+    into listing order and rebuild the summary from them.
+    """
+
+    label = "Shard part"
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self.file = None
+
+    def add(self, index, org_name, timeline):
+        """
+        Append one timeline with its listing position.
+
+        Args:
+            index: Position of the agreement in the deduplicated listing
+            org_name: Organization name
+            timeline: TimelineRecord (see build_timeline)
+        """
+        self.write({"index": index, "org": org_name, "timeline": timeline})
+
+    def _open(self):
+        self.file = open(self.temp_filename, 'w', encoding='utf-8')
+
+    def _write(self, part_row):
+        timeline = part_row["timeline"].to_dict()
+        # Events only feed --store, which each worker writes itself
+        timeline.pop("events", None)
+        self.file.write(json.dumps(dict(part_row, timeline=timeline), ensure_ascii=False) + "\n")
+
+    def _close(self):
+        self.file.close()
+        self.file = None
+
+
+def create_output_writer(filename, output_format, max_participants):
+    """
+    Create the writer for the export file.
+
+    Args:
+        filename: Output filename
+        output_format: One of OUTPUT_FORMATS
+        max_participants: Approver and signer columns, or None to size them
+            to the largest agreement (AutoWidthTimelineWriter)
+
+    Returns:
+        TimelineFileWriter or AutoWidthTimelineWriter instance
+    """
+    if max_participants is None:
+        return AutoWidthTimelineWriter(filename, output_format)
+    return create_timeline_writer(
+        filename,
+        output_format,
+        get_csv_columns(max_participants, max_participants)
+    )
 
-    Exits:
-        Exits with status code 1 on any HTTP error
+
+class ExportSummary:
+    """
+    Running counters for the end-of-run summary, updated as rows are written.
     """
-    url = f"{BASE_URL}{path}"
-    headers = {
-        "X-API-KEY": API_KEY,
-        "Content-Type": "application/json"
-    }
 
-    try:
-        response = requests.get(url, headers=headers, timeout=30)
+    def __init__(self):
+        self.total = 0
+        self.with_approvals = 0
+        self.with_signatures = 0
 
-        # Fail-fast error handling - exit on any non-200 status
-        if response.status_code != 200:
-            print(f"ERROR: API request failed: {path}")
-            print(f"Status code: {response.status_code}")
-            print(f"Response: {response.text}")
-            sys.exit(1)
+    def add(self, timeline):
+        """
+        Count one exported timeline.
 
-        return response.json()
+        Args:
+            timeline: TimelineRecord (see process_agreement)
+        """
+        self.total += 1
+        if timeline.first_approval_date:
+            self.with_approvals += 1
+        if timeline.first_signature_date:
+            self.with_signatures += 1
 
-    except requests.exceptions.RequestException as e:
-        print(f"ERROR: Network request failed: {path}")
-        print(f"Error: {e}")
-        sys.exit(1)
+    @property
+    def without_approvals(self):
+        return self.total - self.with_approvals
 
+    @property
+    def without_signatures(self):
+        return self.total - self.with_signatures
 
-def get_csv_filename():
-    """
-    Generate Windows-compatible timestamped filename.
 
-    Returns:
-        Filename string in format: signed_agreements_execution_time_YYYYMMDD_HHMM.csv
+class QuantileSketch:
     """
-    # Use current time for timestamp (no colons for Windows compatibility)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    return f"signed_agreements_execution_time_{timestamp}.csv"
+    Mergeable quantile sketch with relative accuracy (DDSketch-style).
 
+    Positive values are counted in logarithmic buckets of ratio
+    gamma = (1 + a) / (1 - a), so any quantile is returned within a relative
+    error of a (RELATIVE_ACCURACY) while memory only grows with the range of
+    values, not their number. Sketches with the same accuracy merge exactly.
+    """
 
-def get_organizations():
+    RELATIVE_ACCURACY = 0.01
+    # Above this many buckets the lowest ones are collapsed (keeps high quantiles exact)
+    MAX_BUCKETS = 2048
+
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    LOG_GAMMA = math.log(GAMMA)
+
+    __slots__ = ("buckets", "zero_count", "count")
+
+    def __init__(self):
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        """
+        Add one value (values <= 0 are counted as zero).
+
+        Args:
+            value: Number to add
+        """
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+
+        key = math.ceil(math.log(value) / self.LOG_GAMMA)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.MAX_BUCKETS:
+            self._collapse()
+
+    def merge(self, other):
+        """
+        Add all values of another sketch to this one.
+
+        Args:
+            other: QuantileSketch
+        """
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.MAX_BUCKETS:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the lowest buckets into one so at most MAX_BUCKETS remain."""
+        keys = sorted(self.buckets)
+        excess = keys[:len(keys) - self.MAX_BUCKETS + 1]
+        self.buckets[excess[-1]] += sum(self.buckets.pop(key) for key in excess[:-1])
+
+    def quantile(self, q):
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1 (e.g. 0.9 for p90)
+
+        Returns:
+            Estimated value, or None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key] in relative terms
+                return 2 * self.GAMMA ** key / (self.GAMMA + 1)
+        return 2 * self.GAMMA ** max(self.buckets) / (self.GAMMA + 1)
+
+
+class CycleTimeReport:
     """
-    Fetch list of organizations accessible to the authenticated user.
+    Streaming cycle-time percentiles per organization and per creator.
 
-    Returns:
-        List of organization dictionaries with 'id' and 'name' fields
+    Each exported timeline adds its durations to one QuantileSketch per
+    (group, metric), so percentiles are available after a single pass without
+    keeping the rows. Overall figures are the merge of the organization sketches.
     """
-    print("Fetching organizations...")
-    response = get("/api/rest/1/user/me/organizations")
-    organizations = response.get("organizations", [])
 
-    if not organizations or len(organizations) == 0:
-        print("WARNING: No organizations found for this API key")
-        return []
+    # (metric name, start TimelineRecord attribute, end TimelineRecord attribute)
+    METRICS = [
+        ("creation_to_first_approval", "creation_date", "first_approval_date"),
+        ("first_approval_to_last_signature", "first_approval_date", "last_signature_date"),
+        ("creation_to_execution", "creation_date", "last_signature_date"),
+    ]
+    QUANTILES = [0.5, 0.9, 0.99]
+
+    def __init__(self):
+        # {(group type, group name): {metric name: QuantileSketch}}
+        self.sketches = {}
+        self.negative_durations = 0
+
+    def _sketch(self, group_type, group_name, metric):
+        group = self.sketches.get((group_type, group_name))
+        if group is None:
+            group = self.sketches[(group_type, group_name)] = {}
+        sketch = group.get(metric)
+        if sketch is None:
+            sketch = group[metric] = QuantileSketch()
+        return sketch
+
+    def add(self, org_name, timeline):
+        """
+        Add the cycle times of one exported timeline.
+
+        Args:
+            org_name: Organization name
+            timeline: TimelineRecord (see build_timeline)
+        """
+        creator = timeline.created_by or "(unknown)"
+        for metric, start_attribute, end_attribute in self.METRICS:
+            start = getattr(timeline, start_attribute)
+            end = getattr(timeline, end_attribute)
+            if start is None or end is None:
+                continue
+            if end < start:
+                # E.g. signed before the first approval: not a meaningful cycle time
+                self.negative_durations += 1
+                continue
+            self._sketch("organization", org_name, metric).add(end - start)
+            self._sketch("creator", creator, metric).add(end - start)
+
+    def overall(self):
+        """
+        Merge the organization sketches into overall sketches.
+
+        Returns:
+            Dictionary of metric name to QuantileSketch
+        """
+        merged = {metric: QuantileSketch() for metric, _, _ in self.METRICS}
+        for (group_type, _), group in self.sketches.items():
+            if group_type == "organization":
+                for metric, sketch in group.items():
+                    merged[metric].merge(sketch)
+        return merged
+
+    def rows(self):
+        """
+        Yield report rows: overall, then organizations, then creators.
+
+        Yields:
+            Tuples of (group type, group name, metric, count, p50, p90, p99),
+            with percentiles in hours (rounded to 0.1)
+        """
+        groups = [(("overall", ""), self.overall())]
+        for group_type in ("organization", "creator"):
+            groups.extend(sorted(
+                (key, group) for key, group in self.sketches.items() if key[0] == group_type
+            ))
+
+        for (group_type, group_name), group in groups:
+            for metric, _, _ in self.METRICS:
+                sketch = group.get(metric)
+                if sketch is None or sketch.count == 0:
+                    continue
+                percentiles = [round(sketch.quantile(q) / 3600000, 1) for q in self.QUANTILES]
+                yield (group_type, group_name, metric, sketch.count, *percentiles)
+
+    def write_csv(self, filename):
+        """
+        Write the report as CSV.
+
+        Args:
+            filename: Output CSV filename
+        """
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(["Group", "Name", "Metric", "Agreements",
+                                 "P50 (hours)", "P90 (hours)", "P99 (hours)"])
+                writer.writerows(self.rows())
+        except IOError as e:
+            print(f"ERROR: Failed to write cycle time report: {e}")
+            sys.exit(1)
 
-    print(f"✓ Found {len(organizations)} organization(s)")
-    return organizations
+        print(f"✓ Cycle time report written: {filename}")
 
 
-def validate_api_key():
+class ProgressReporter:
     """
-    Validate that API key has been configured (not placeholder value).
+    Periodic progress line: completed/listed agreements, rate and ETA.
 
-    Exits:
-        Exits with status code 1 if API key is not configured
+    update() is cheap and can be called for every agreement; a line is only
+    printed every `interval` seconds. The total is the number of agreements
+    listed so far, and the ETA is only shown once every listing is complete.
     """
-    if not API_KEY or API_KEY == "YOUR_API_KEY_HERE" or API_KEY.strip() == "":
-        print("ERROR: Please set your API_KEY in the script")
-        print("Generate your API key at: https://secure.concordnow.com/#/automations/integrations")
-        print("Then replace 'YOUR_API_KEY_HERE' on line 15 with your actual API key")
-        sys.exit(1)
-
 
-def get_signed_agreements(org_id):
+    def __init__(self, interval=10.0):
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.completed = 0
+        self.listed = 0
+        self.listing_complete = False
+
+    def update(self, completed, listed, listing_complete):
+        """
+        Record progress, printing a line if the interval has elapsed.
+
+        Args:
+            completed: Agreements exported so far
+            listed: Unique agreements listed so far
+            listing_complete: Whether every organization has been listed
+        """
+        self.completed = completed
+        self.listed = max(listed, completed)
+        self.listing_complete = listing_complete
+
+        now = time.monotonic()
+        if self.interval and now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def rate(self):
+        """Agreements exported per second since the start."""
+        elapsed = time.monotonic() - self.started
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self):
+        """Estimated seconds left, or None while listing or before any progress."""
+        rate = self.rate()
+        if not self.listing_complete or rate <= 0:
+            return None
+        return (self.listed - self.completed) / rate
+
+    def report(self):
+        """Print the progress line and log it."""
+        rate = self.rate()
+        eta = self.eta_seconds()
+        if self.listing_complete:
+            percent = 100.0 * self.completed / self.listed if self.listed else 100.0
+            counts = f"{self.completed:,}/{self.listed:,} agreements ({percent:.1f}%)"
+        else:
+            counts = f"{self.completed:,}/{self.listed:,}+ agreements (listing)"
+        eta_text = f", ETA {format_duration(eta)}" if eta is not None else ""
+        print(f"  Progress: {counts}, {rate:.1f}/s{eta_text}")
+        log_event(
+            "progress",
+            completed=self.completed,
+            listed=self.listed,
+            listing_complete=self.listing_complete,
+            rate=round(rate, 2),
+            eta_seconds=round(eta, 1) if eta is not None else None
+        )
+        if _run_log is not None:
+            _run_log.flush()
+
+
+def format_duration(seconds):
     """
-    Fetch paginated list of signed agreements for an organization.
-
-    Uses pagination with numberOfItemsByPage=500. Page numbering starts at 0.
-    Filters for all "signed" status values using multiple status parameters.
-    Includes all access types (DIRECT, TAG, FOLDER, ORGANIZATION) to get complete list.
+    Format a duration for progress lines.
 
     Args:
-        org_id: Organization ID
+        seconds: Duration in seconds
 
     Returns:
-        List of agreement dictionaries with uuid, title, status, organizationId fields
+        String such as "45s", "12m05s" or "2h03m"
     """
-    all_agreements = []
-    page = 0  # Page numbering starts at 0
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
 
-    # Build status filter parameters (all signed statuses)
-    # These map to the "SIGNED" stage in Concord
-    status_params = [
-        "statuses=UNKNOWN_CONTRACT",
-        "statuses=FUTURE_CONTRACT",
-        "statuses=CURRENT_CONTRACT",
-        "statuses=COMPLETED_CONTRACT",
-        "statuses=COMPLETED_CANCEL_CONTRACT",
-        "statuses=COMPLETED_CONTRACT_RENEWABLE"
-    ]
 
-    # Build access type parameters (all types to get complete list)
-    access_params = [
-        "accessType=DIRECT",
-        "accessType=TAG",
-        "accessType=FOLDER",
-        "accessType=ORGANIZATION"
-    ]
+def write_csv(filename, agreement_timelines):
+    """
+    Write agreement timeline data to CSV file.
 
-    while True:
-        # Construct query string with all parameters
-        query_parts = status_params + access_params + [
-            f"numberOfItemsByPage=500",
-            f"page={page}"
-        ]
-        query_string = "&".join(query_parts)
+    Columns are described by get_csv_columns() (31 columns total).
+
+    Args:
+        filename: Output CSV filename
+        agreement_timelines: Iterable of TimelineRecord instances
+    """
+    writer = CsvTimelineWriter(filename)
+    for timeline in agreement_timelines:
+        writer.write(timeline)
+    # Always produce a file, even with only the header row
+    writer.ensure_open()
+    writer.close()
 
-        print(f"Fetching agreements (page {page})...")
-        path = f"/api/rest/1/user/me/organizations/{org_id}/agreements?{query_string}"
-        response = get(path)
 
-        # API returns {"items": [...]} not a direct array
-        items = response.get("items", [])
+def read_timelines(filename):
+    """
+    Read timelines back from a CSV or JSON Lines export (optionally compressed).
 
-        if not items:
-            break
+    CSV columns are matched by header, so exports with any number of
+    approver/signer columns can be read. Dates are converted back to Unix
+    millisecond timestamps and counts to integers.
 
-        all_agreements.extend(items)
-        print(f"  Retrieved {len(items)} agreements from page {page}")
+    Args:
+        filename: Export filename (.csv, .jsonl, with optional .gz/.zst suffix)
 
-        # Continue if we got a full page (might be more)
-        if len(items) < 500:
-            break
+    Returns:
+        Dictionary mapping agreement uuid to TimelineRecord
+    """
+    key_by_header = {header: key for header, key in get_csv_columns(1000, 1000)}
+    timelines = {}
 
-        page += 1
+    try:
+        with open_text_input(filename) as f:
+            if ".jsonl" in filename:
+                rows = (json.loads(line) for line in f if line.strip())
+            else:
+                reader = csv.reader(f)
+                headers = next(reader, [])
+                keys = [key_by_header.get(header, header) for header in headers]
+                rows = (dict(zip(keys, row)) for row in reader)
+
+            for timeline in rows:
+                for key, value in timeline.items():
+                    if is_timestamp_key(key):
+                        timeline[key] = utc_string_to_unix_ms(value)
+                    elif is_count_key(key):
+                        timeline[key] = int(value or 0)
+                    elif value is None:
+                        timeline[key] = ""
+                timelines[timeline.get("agreementId", "")] = TimelineRecord.from_dict(timeline)
+
+    except (IOError, ValueError) as e:
+        print(f"ERROR: Failed to read {filename}: {e}")
+        sys.exit(1)
 
-    return all_agreements
+    return timelines
 
 
-def get_agreement_activities(org_id, agreement_uid):
+def load_incremental_state(filename):
     """
-    Fetch audit trail activities for a specific agreement.
+    Load the watermark saved by the previous incremental run.
 
     Args:
-        org_id: Organization ID
-        agreement_uid: Agreement UID
+        filename: JSON state file
 
     Returns:
-        List of activity dictionaries with name, createdAt, and other fields
-        Returns {"activities": [...]} response structure
+        Dictionary with 'lastRun', 'outputFile' and 'agreements' (uuid -> status),
+        or None if no previous state exists
     """
-    path = f"/api/rest/1/organizations/{org_id}/agreements/{agreement_uid}/activities?type=AUDIT"
-    response = get(path)
+    if not os.path.exists(filename):
+        return None
 
-    # Return full response (contains {"activities": [...]})
-    return response
+    try:
+        with open(filename, encoding='utf-8') as f:
+            return json.load(f)
+    except (IOError, ValueError) as e:
+        print(f"ERROR: Failed to read incremental state {filename}: {e}")
+        sys.exit(1)
 
 
-def extract_creation_date(activities_response):
+def save_incremental_state(filename, output_file, agreement_statuses, agreement_milliseconds=None):
     """
-    Extract creation date from earliest activity in audit trail.
+    Save the watermark for the next incremental run.
 
-    The creation date is the timestamp of the first (earliest) activity,
-    NOT from the agreements list API (which is not always accurate).
+    The file is replaced atomically so an interrupted write never corrupts it.
 
     Args:
-        activities_response: Response dict with "activities" key
-
-    Returns:
-        UTC datetime string of earliest activity, or empty string if no activities
+        filename: JSON state file
+        output_file: CSV file written by this run
+        agreement_statuses: Dictionary mapping agreement uuid to listing status
+        agreement_milliseconds: Dictionary mapping agreement uuid to the
+            timestamps the export rounds to the second (see subsecond_timestamps)
     """
-    activities = activities_response.get("activities", [])
+    state = {
+        "lastRun": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        "outputFile": os.path.abspath(output_file),
+        "agreements": agreement_statuses,
+        "milliseconds": agreement_milliseconds or {},
+    }
 
-    if not activities:
-        return ""
+    try:
+        temp_filename = f"{filename}.tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_filename, filename)
+    except IOError as e:
+        print(f"ERROR: Failed to write incremental state {filename}: {e}")
+        sys.exit(1)
 
-    # Find earliest timestamp across ALL activities
-    earliest_timestamp = min(activity.get("createdAt", float('inf')) for activity in activities)
 
-    if earliest_timestamp == float('inf'):
-        return ""
+def subsecond_timestamps(timeline):
+    """
+    Return the timestamps of a timeline that the export cannot hold exactly.
+
+    Exported dates have second precision, so these are saved in the
+    incremental state to give reused rows their exact timestamps back.
+
+    Args:
+        timeline: TimelineRecord
 
-    return unix_ms_to_utc_string(earliest_timestamp)
+    Returns:
+        Dictionary mapping timeline key to Unix millisecond timestamp, for the
+        timestamps that are not whole seconds (empty if there are none)
+    """
+    return {
+        key: value for key, value in timeline.to_dict().items()
+        if is_timestamp_key(key) and value and value % 1000
+    }
 
 
-def extract_created_by(activities_response):
+def restore_subsecond_timestamps(timeline, milliseconds):
     """
-    Extract the email of the user who created the agreement from the earliest activity.
+    Put the timestamps saved by subsecond_timestamps() back into a row read from an export.
 
     Args:
-        activities_response: Response dict with "activities" key
+        timeline: TimelineRecord read by read_timelines()
+        milliseconds: Dictionary mapping timeline key to Unix millisecond timestamp
 
     Returns:
-        User email address, or empty string if cannot determine
+        TimelineRecord with the exact timestamps (values that no longer match
+        the exported second are left as read)
     """
-    activities = activities_response.get("activities", [])
+    values = timeline.to_dict()
+    for key, value in milliseconds.items():
+        if values.get(key) == value - value % 1000:
+            values[key] = value
+    return TimelineRecord.from_dict(values)
 
-    if not activities:
-        return ""
 
-    # Find earliest activity
-    earliest_activity = min(activities, key=lambda a: a.get("createdAt", float('inf')))
+def load_reusable_timelines(state):
+    """
+    Collect timelines from the previous export that can be reused as-is.
 
-    # Extract user email from creator.actor structure
-    creator = earliest_activity.get("creator", {})
-    actor = creator.get("actor", {})
+    Args:
+        state: State loaded by load_incremental_state() (or None)
 
-    return actor.get("email", "")
+    Returns:
+        Dictionary mapping agreement uuid to (status, TimelineRecord)
+    """
+    if not state:
+        return {}
+
+    output_file = state.get("outputFile", "")
+    if not os.path.exists(output_file):
+        print(f"WARNING: Previous export {output_file} not found, running a full export")
+        return {}
+
+    statuses = state.get("agreements", {})
+    # Missing from states written before exact timestamps were saved
+    milliseconds = state.get("milliseconds", {})
+    previous_timelines = read_timelines(output_file)
+
+    reusable = {}
+    for uuid, timeline in previous_timelines.items():
+        if uuid not in statuses:
+            continue
+        if uuid in milliseconds:
+            timeline = restore_subsecond_timestamps(timeline, milliseconds[uuid])
+        reusable[uuid] = (statuses[uuid], timeline)
+    return reusable
 
 
-def extract_approval_dates(activities_response):
+def load_shard_summaries(shard_count):
     """
-    Extract first and last approval dates from audit trail.
-
-    Filters for VALIDATION_ACCEPT activity type (workflow approvals).
+    Read the summary file of every shard of a --shard export and check they match.
 
     Args:
-        activities_response: Response dict with "activities" key
+        shard_count: Number of shards
 
     Returns:
-        Tuple of (first_approval_utc, last_approval_utc) as strings
-        Returns ("", "") if no approval activities found
+        List of shard summary dictionaries, in shard order
+
+    Exits:
+        Exits with status code 1 if a shard has not finished, or if the shards
+        saw different listings or used different --max-participants
     """
-    activities = activities_response.get("activities", [])
+    summaries = []
+    for shard_index in range(1, shard_count + 1):
+        _, summary_file, _ = get_shard_filenames(shard_index, shard_count)
+        try:
+            with open(summary_file, 'r', encoding='utf-8') as f:
+                summaries.append(json.load(f))
+        except FileNotFoundError:
+            print(f"ERROR: Shard {shard_index}/{shard_count} has not finished ({summary_file} not found)")
+            sys.exit(1)
+        except (IOError, ValueError) as e:
+            print(f"ERROR: Failed to read {summary_file}: {e}")
+            sys.exit(1)
 
-    # Filter for approval activities (VALIDATION_ACCEPT)
-    approval_activities = [
-        activity for activity in activities
-        if activity.get("name") == "VALIDATION_ACCEPT"
-    ]
+    # Listing positions only line up if every worker saw the same listing
+    first = summaries[0]
+    for shard_index, summary in enumerate(summaries[1:], start=2):
+        if (summary.get("listed"), summary.get("listingDigest")) != (first.get("listed"), first.get("listingDigest")):
+            print(f"ERROR: Shards 1 and {shard_index} listed different agreements "
+                  f"({first.get('listed')} and {summary.get('listed')}); the listing changed "
+                  f"between their runs, re-run the shards")
+            sys.exit(1)
+        if summary.get("maxParticipants") != first.get("maxParticipants"):
+            print(f"ERROR: Shards 1 and {shard_index} were run with different --max-participants")
+            sys.exit(1)
 
-    if not approval_activities:
-        return ("", "")
+    return summaries
 
-    # Get timestamps
-    timestamps = [activity.get("createdAt") for activity in approval_activities if activity.get("createdAt")]
 
-    if not timestamps:
-        return ("", "")
+def iter_shard_part(filename):
+    """
+    Read the rows of a shard part file (see ShardPartWriter).
 
-    # Sort to find first and last
-    timestamps.sort()
-    first_utc = unix_ms_to_utc_string(timestamps[0])
-    last_utc = unix_ms_to_utc_string(timestamps[-1])
+    Args:
+        filename: Part filename
 
-    return (first_utc, last_utc)
+    Yields:
+        Dictionaries with 'index', 'org' and 'timeline', in listing order
+    """
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+    except (IOError, ValueError) as e:
+        print(f"ERROR: Failed to read {filename}: {e}")
+        sys.exit(1)
 
 
-def extract_detailed_approvals(activities_response, max_approvers=5):
+def merge_shard_outputs(shard_count, output_format, cycle_times_filename=None):
     """
-    Extract up to max_approvers approval details (email + date) from audit trail.
+    Combine the part files of a finished --shard export into the final output.
 
-    Filters for VALIDATION_ACCEPT activity type (workflow approvals).
+    Rows are interleaved back into listing order, so the output is the same
+    as a single-worker export. Export counters and cycle times are rebuilt
+    from the rows; duplicates and HTTP counters come from the shard summaries.
+    No API calls are made and the part files are kept.
 
     Args:
-        activities_response: Response dict with "activities" key
-        max_approvers: Maximum number of approvers to return (default: 5)
+        shard_count: Number of shards
+        output_format: One of OUTPUT_FORMATS
+        cycle_times_filename: Optional cycle time report CSV filename
 
-    Returns:
-        Tuple of (approvals_list, total_count)
-        - approvals_list: List of dicts with 'email' and 'date' (up to max_approvers)
-        - total_count: Total number of approvals (including those beyond max_approvers)
+    Exits:
+        Exits with status code 1 if a shard is missing or inconsistent
     """
-    activities = activities_response.get("activities", [])
+    summaries = load_shard_summaries(shard_count)
+    print(f"Merging {shard_count} shard(s) of {summaries[0].get('listed', 0)} listed agreement(s)...")
+
+    parts = []
+    for shard_index, shard_summary in enumerate(summaries, start=1):
+        if shard_summary.get("exported"):
+            part_file, _, _ = get_shard_filenames(shard_index, shard_count)
+            parts.append(iter_shard_part(part_file))
+
+    filename = get_csv_filename(output_format)
+    output_writer = create_output_writer(filename, output_format, summaries[0].get("maxParticipants"))
+    atexit.register(output_writer.abort)
+    summary = ExportSummary()
+    cycle_times = CycleTimeReport()
+
+    for part_row in heapq.merge(*parts, key=lambda row: row["index"]):
+        timeline = TimelineRecord.from_dict(part_row["timeline"])
+        output_writer.write(timeline)
+        summary.add(timeline)
+        cycle_times.add(part_row["org"], timeline)
+
+    if not output_writer.close():
+        print("No agreements to export. Exiting.")
+        sys.exit(0)
+    if cycle_times_filename:
+        cycle_times.write_csv(cycle_times_filename)
 
-    # Filter for approval activities (VALIDATION_ACCEPT)
-    approval_activities = [
-        activity for activity in activities
-        if activity.get("name") == "VALIDATION_ACCEPT"
-    ]
+    print()
+    print("✓ Merge complete!")
+    print()
+    print(f"Output file: {filename}")
+    print(f"Total agreements exported: {summary.total}")
+    print(f"Agreements with approvals: {summary.with_approvals}")
+    print(f"Agreements without approvals: {summary.without_approvals}")
+    print(f"Agreements with signatures: {summary.with_signatures}")
+    print(f"Agreements without signatures: {summary.without_signatures}")
+    print(f"Duplicate agreements skipped: {summaries[0].get('duplicatesSkipped', 0)}")
+    for group_type, _, metric, count, p50, p90, p99 in cycle_times.rows():
+        if group_type != "overall":
+            break
+        print(f"Cycle time {metric.replace('_', ' ')}: p50 {p50}h, p90 {p90}h, p99 {p99}h ({count} agreements)")
+    for shard_index, shard_summary in enumerate(summaries, start=1):
+        http_stats = shard_summary.get("http", {})
+        print(f"Shard {shard_index}/{shard_count}: {shard_summary.get('exported', 0)} agreement(s), "
+              f"{http_stats.get('requests', 0)} HTTP request(s), {http_stats.get('retries', 0)} retries, "
+              f"finished {shard_summary.get('finishedAt', 'unknown')}")
 
-    if not approval_activities:
-        return ([], 0)
 
-    # Sort by timestamp (earliest first)
-    approval_activities.sort(key=lambda a: a.get("createdAt", 0))
+class Checkpoint:
+    """
+    Append-only JSON Lines record of completed agreements for --resume.
 
-    # Extract approver details
-    approvals = []
-    for activity in approval_activities[:max_approvers]:
-        # Extract email from creator.actor structure
-        creator = activity.get("creator", {})
-        actor = creator.get("actor", {})
-        approver_email = actor.get("email", "")
-        approval_date = unix_ms_to_utc_string(activity.get("createdAt"))
+    Each line holds one agreement's uuid and timeline. Lines are buffered and
+    flushed every FLUSH_INTERVAL records or FLUSH_SECONDS seconds, and on exit,
+    so an interrupted export loses at most the last few agreements.
+    """
 
-        approvals.append({
-            "email": approver_email,
-            "date": approval_date
-        })
+    FLUSH_INTERVAL = 100
+    FLUSH_SECONDS = 30.0
 
-    return (approvals, len(approval_activities))
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.completed = self._load(path) if resume else {}
+        self.buffer = []
+        self.last_flush = time.monotonic()
 
+        try:
+            self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        except IOError as e:
+            print(f"ERROR: Failed to open checkpoint file {path}: {e}")
+            sys.exit(1)
 
-def extract_signature_dates(activities_response):
+    @staticmethod
+    def _load(path):
+        """Read completed timelines, skipping a partially written last line."""
+        completed = {}
+        if not os.path.exists(path):
+            return completed
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                completed[entry["uuid"]] = TimelineRecord.from_dict(entry["timeline"])
+
+        return completed
+
+    def record(self, agreement_uuid, timeline):
+        """
+        Record a completed agreement.
+
+        Args:
+            agreement_uuid: Agreement UUID
+            timeline: TimelineRecord for the agreement
+        """
+        self.buffer.append(json.dumps({"uuid": agreement_uuid, "timeline": timeline.to_dict()}))
+        if (len(self.buffer) >= self.FLUSH_INTERVAL
+                or time.monotonic() - self.last_flush >= self.FLUSH_SECONDS):
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        if self.file is None:
+            return
+        if self.buffer:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.buffer = []
+        self.file.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self, remove=False):
+        """
+        Flush and close the checkpoint file.
+
+        Args:
+            remove: Delete the file (the export completed successfully)
+        """
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+        if remove:
+            os.remove(self.path)
+
+
+class TimelineStore:
     """
-    Extract first and last signature dates from audit trail.
+    SQLite database of exported timelines, for ad-hoc queries across runs.
 
-    Filters for NEGOTIATION_APPROVE activity type (eSignatures),
-    or AGREEMENT_SIGNATURE_FINALIZE activity type (finalize signature).
+    Each agreement is upserted into the "agreements" table (one row per uuid,
+    with its summary dates and totals), and every approval and signature goes
+    to the normalized "events" table, without the column limit of the CSV.
+    Dates are stored as Unix millisecond timestamps. Writes are committed
+    every COMMIT_INTERVAL agreements and on close().
+    """
 
-    Args:
-        activities_response: Response dict with "activities" key
+    COMMIT_INTERVAL = 500
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS agreements ("
+        " uuid TEXT PRIMARY KEY,"
+        " org_id TEXT,"
+        " title TEXT,"
+        " link TEXT,"
+        " status TEXT,"
+        " creation_date INTEGER,"
+        " created_by TEXT,"
+        " first_approval_date INTEGER,"
+        " last_approval_date INTEGER,"
+        " first_signature_date INTEGER,"
+        " last_signature_date INTEGER,"
+        " total_approvals INTEGER,"
+        " total_signatures INTEGER,"
+        " exported_at INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS events ("
+        " uuid TEXT NOT NULL,"
+        " kind TEXT NOT NULL,"
+        " position INTEGER NOT NULL,"
+        " activity TEXT,"
+        " actor_email TEXT,"
+        " created_at INTEGER,"
+        " PRIMARY KEY (uuid, kind, position))",
+        # The primary key indexes events by uuid
+        "CREATE INDEX IF NOT EXISTS events_actor_email ON events (actor_email, created_at)",
+        "CREATE INDEX IF NOT EXISTS events_activity ON events (activity, created_at)",
+        "CREATE INDEX IF NOT EXISTS events_created_at ON events (created_at)",
+        "CREATE INDEX IF NOT EXISTS agreements_org_id ON agreements (org_id)",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self.agreements_written = 0
+        self.events_written = 0
+        self.uncommitted = 0
+
+        try:
+            self.conn = sqlite3.connect(path)
+            for statement in self.SCHEMA:
+                self.conn.execute(statement)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"ERROR: Failed to open timeline store {path}: {e}")
+            sys.exit(1)
 
-    Returns:
-        Tuple of (first_signature_utc, last_signature_utc) as strings
-        Returns ("", "") if no signature activities found
+    def write(self, org_id, agreement, timeline):
+        """
+        Insert or update one agreement and, if present, its events.
+
+        Timelines without events (e.g. reused by --incremental) update the
+        agreement row and keep the events stored by an earlier run.
+
+        Args:
+            org_id: Organization ID
+            agreement: Agreement dictionary with uuid, status fields
+            timeline: TimelineRecord (see build_timeline)
+        """
+        agreement_uuid = agreement.get("uuid")
+        self.conn.execute(
+            "INSERT INTO agreements (uuid, org_id, title, link, status, creation_date, created_by,"
+            " first_approval_date, last_approval_date, first_signature_date, last_signature_date,"
+            " total_approvals, total_signatures, exported_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (uuid) DO UPDATE SET"
+            " org_id = excluded.org_id, title = excluded.title, link = excluded.link,"
+            " status = excluded.status, creation_date = excluded.creation_date,"
+            " created_by = excluded.created_by,"
+            " first_approval_date = excluded.first_approval_date,"
+            " last_approval_date = excluded.last_approval_date,"
+            " first_signature_date = excluded.first_signature_date,"
+            " last_signature_date = excluded.last_signature_date,"
+            " total_approvals = excluded.total_approvals,"
+            " total_signatures = excluded.total_signatures,"
+            " exported_at = excluded.exported_at",
+            (
+                agreement_uuid,
+                str(org_id),
+                timeline.agreement_title,
+                timeline.agreement_link,
+                agreement.get("status"),
+                timeline.creation_date,
+                timeline.created_by,
+                timeline.first_approval_date,
+                timeline.last_approval_date,
+                timeline.first_signature_date,
+                timeline.last_signature_date,
+                timeline.total_approvals,
+                timeline.total_signatures,
+                int(time.time() * 1000),
+            )
+        )
+
+        events = timeline.events
+        if events is not None:
+            # Replace the agreement's events, positions count from 1 per kind
+            self.conn.execute("DELETE FROM events WHERE uuid = ?", (agreement_uuid,))
+            positions = {}
+            rows = []
+            for event in events:
+                kind = event["kind"]
+                positions[kind] = positions.get(kind, 0) + 1
+                rows.append((
+                    agreement_uuid,
+                    kind,
+                    positions[kind],
+                    event.get("activity"),
+                    event.get("email"),
+                    event.get("createdAt"),
+                ))
+            self.conn.executemany(
+                "INSERT INTO events (uuid, kind, position, activity, actor_email, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.events_written += len(rows)
+
+        self.agreements_written += 1
+        self.uncommitted += 1
+        if self.uncommitted >= self.COMMIT_INTERVAL:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def close(self):
+        """Commit pending writes and close the database (safe to call twice)."""
+        if self.conn is None:
+            return
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
+
+
+class TimelineChange:
     """
-    activities = activities_response.get("activities", [])
+    One row of a --diff delta file: the operation, then the timeline columns.
 
-    # Filter for signature activities (NEGOTIATION_APPROVE and AGREEMENT_SIGNATURE_FINALIZE)
-    signature_activities = [
-        activity for activity in activities
-        if activity.get("name") in ["NEGOTIATION_APPROVE", "AGREEMENT_SIGNATURE_FINALIZE"]
-    ]
+    Delete rows only carry the agreement ID (see ChangeDataCapture.close).
+    """
 
-    if not signature_activities:
-        return ("", "")
+    __slots__ = ("operation", "timeline")
 
-    # Get timestamps
-    timestamps = [activity.get("createdAt") for activity in signature_activities if activity.get("createdAt")]
+    def __init__(self, operation, timeline):
+        self.operation = operation
+        self.timeline = timeline
 
-    if not timestamps:
-        return ("", "")
+    def values(self, keys):
+        """Return the raw values of the row, for the operation key followed by timeline keys."""
+        return [self.operation] + self.timeline.values(keys[1:])
 
-    # Sort to find first and last
-    timestamps.sort()
-    first_utc = unix_ms_to_utc_string(timestamps[0])
-    last_utc = unix_ms_to_utc_string(timestamps[-1])
 
-    return (first_utc, last_utc)
+class ChangeDataCapture:
+    """
+    Write only the rows that changed since the previous run to a delta file (--diff).
+
+    The state file keeps a content hash of every exported row by agreement
+    uuid. Rows with a new uuid are written as "insert", rows whose hash changed
+    as "update", and close() adds a "delete" row for every uuid of the previous
+    run that was not exported again; unchanged rows are skipped. Rows are
+    hashed as formatted for the CSV, so a row reused by --incremental matches
+    the one fetched by the previous run. Used in place of the output writer,
+    optionally passing every row on to the full export (--snapshot). The state
+    file is only replaced once the delta file has been written.
+    """
 
+    OPERATION_COLUMN = ("Operation", "operation")
+
+    def __init__(self, state_file, filename, output_format, columns, snapshot_writer=None):
+        self.state_file = state_file
+        self.keys = tuple(key for _, key in columns)
+        self.delta_writer = create_timeline_writer(filename, output_format, [self.OPERATION_COLUMN] + list(columns))
+        self.snapshot_writer = snapshot_writer
+        self.previous_state = self._load(state_file)
+        self.previous_hashes = self.previous_state.get("rows", {}) if self.previous_state else {}
+        self.hashes = {}
+        self.counts = {"insert": 0, "update": 0, "delete": 0, "unchanged": 0}
+
+    @staticmethod
+    def _load(path):
+        """Read the state of the previous run, or None if there is none."""
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, ValueError) as e:
+            print(f"ERROR: Failed to read diff state {path}: {e}")
+            sys.exit(1)
 
-def extract_detailed_signatures(activities_response, max_signers=5):
+    def write(self, timeline):
+        """
+        Compare one timeline with the previous run and write it if it changed.
+
+        Args:
+            timeline: TimelineRecord (see build_timeline)
+        """
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.write(timeline)
+
+        row = json.dumps(format_csv_row(timeline, self.keys), ensure_ascii=False)
+        row_hash = hashlib.blake2b(row.encode("utf-8"), digest_size=16).hexdigest()
+        self.hashes[timeline.agreement_id] = row_hash
+
+        previous_hash = self.previous_hashes.get(timeline.agreement_id)
+        if previous_hash == row_hash:
+            self.counts["unchanged"] += 1
+            return
+        operation = "insert" if previous_hash is None else "update"
+        self.counts[operation] += 1
+        self.delta_writer.write(TimelineChange(operation, timeline))
+
+    def close(self):
+        """
+        Write the delete rows, finish the delta (and snapshot) file and save the state.
+
+        The delta file is written even when nothing changed (header only for CSV).
+
+        Returns:
+            True (the delta file is always written)
+        """
+        for agreement_id in sorted(self.previous_hashes.keys() - self.hashes.keys()):
+            deleted = TimelineRecord(agreement_id=agreement_id, total_approvals=None, total_signatures=None)
+            self.delta_writer.write(TimelineChange("delete", deleted))
+            self.counts["delete"] += 1
+
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.close()
+        self.delta_writer.ensure_open()
+        self.delta_writer.close()
+
+        state = {
+            "lastRun": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "rows": self.hashes,
+        }
+        write_file_atomically(self.state_file, json.dumps(state) + "\n", "diff state")
+        return True
+
+    def abort(self):
+        """Discard the unfinished delta (and snapshot) file, keeping the previous state."""
+        self.delta_writer.abort()
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.abort()
+
+
+def iter_ordered_results(func, items, workers, window=None):
     """
-    Extract up to max_signers signature details (email + date) from audit trail.
+    Apply func to each item on a thread pool, yielding results in input order.
 
-    Filters for NEGOTIATION_APPROVE and AGREEMENT_SIGNATURE_FINALIZE activity types.
+    At most `window` calls (default workers * 2) are in flight at any time.
+    Items are pulled lazily, so items may be an endless or slow generator.
+    The first call that raises (including SystemExit from get()) cancels all
+    queued calls and its exception is re-raised in the caller, so a fatal
+    error still stops the run.
 
     Args:
-        activities_response: Response dict with "activities" key
-        max_signers: Maximum number of signers to return (default: 5)
+        func: Callable taking a single item
+        items: Iterable of items
+        workers: Number of worker threads (1 = sequential, no thread pool)
+        window: Maximum number of submitted but not yet yielded calls
 
-    Returns:
-        Tuple of (signatures_list, total_count)
-        - signatures_list: List of dicts with 'email' and 'date' (up to max_signers)
-        - total_count: Total number of signatures (including those beyond max_signers)
+    Yields:
+        func(item) for each item, in the order of items
     """
-    activities = activities_response.get("activities", [])
-
-    # Filter for signature activities
-    signature_activities = [
-        activity for activity in activities
-        if activity.get("name") in ["NEGOTIATION_APPROVE", "AGREEMENT_SIGNATURE_FINALIZE"]
-    ]
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    window = window or workers * 2
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    def next_result():
+        # Wait for the head of the queue, but surface any failure immediately
+        head = pending[0]
+        while True:
+            for future in pending:
+                if future.done() and not future.cancelled() and future.exception() is not None:
+                    raise future.exception()
+            if head.done():
+                return pending.popleft().result()
+            # Only wait on running calls: finished ones would return at once
+            # and spin (the head is still running, so the list is never empty)
+            wait([future for future in pending if not future.done()], return_when=FIRST_COMPLETED)
 
-    if not signature_activities:
-        return ([], 0)
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= window:
+                yield next_result()
 
-    # Sort by timestamp (earliest first)
-    signature_activities.sort(key=lambda a: a.get("createdAt", 0))
+        while pending:
+            yield next_result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
 
-    # Extract signer details
-    signatures = []
-    for activity in signature_activities[:max_signers]:
-        # Extract email from creator.actor structure
-        creator = activity.get("creator", {})
-        actor = creator.get("actor", {})
-        signer_email = actor.get("email", "")
-        signature_date = unix_ms_to_utc_string(activity.get("createdAt"))
 
-        signatures.append({
-            "email": signer_email,
-            "date": signature_date
-        })
+class AdaptiveConcurrencyController:
+    """
+    AIMD limit on in-flight API requests for the asyncio engine.
 
-    return (signatures, len(signature_activities))
+    The limit grows by one after every window of healthy responses and is
+    cut multiplicatively on 429, 5xx and network errors, or when the p95
+    latency of a window rises well above the best p95 seen recently. The
+    latency baseline drifts upward slowly so that a generally slower API
+    (time of day, tenant load) does not pin the limit at its minimum.
 
+    observe() is called from request threads; acquire()/release() run on
+    the event loop. Raising the limit wakes up waiting requests.
+    """
 
-def construct_agreement_url(org_id, agreement_uuid):
+    def __init__(self, initial=4, minimum=1, maximum=64, window=20,
+                 latency_tolerance=1.5, decrease_factor=0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.peak_limit = self.limit
+        self.increases = 0
+        self.decreases = 0
+        self.samples = []
+        self.baseline_p95 = None
+        # time.monotonic() of the last cut: responses to requests sent before it do not cut again
+        self.last_decrease = float('-inf')
+        self.lock = threading.Lock()
+        self.condition = None
+        self.loop = None
+        # Pending _notify() tasks (the event loop only keeps weak references)
+        self.notify_tasks = set()
+
+    async def acquire(self):
+        """Wait until a request slot is free under the current limit."""
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+            self.loop = asyncio.get_running_loop()
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self):
+        """Free a request slot and wake up waiting requests."""
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    async def _notify(self):
+        """Wake up waiting requests after the limit was raised."""
+        async with self.condition:
+            self.condition.notify_all()
+
+    def _start_notify(self):
+        """Run _notify() on the event loop (scheduled from a request thread)."""
+        task = self.loop.create_task(self._notify())
+        self.notify_tasks.add(task)
+        task.add_done_callback(self.notify_tasks.discard)
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        await self.release()
+
+    def observe(self, path, status_code, latency):
+        """
+        Adjust the limit from the outcome of one HTTP attempt (see add_response_observer).
+
+        Args:
+            path: Request path (unused)
+            status_code: HTTP status, or None for a network error
+            latency: Request latency in seconds
+        """
+        with self.lock:
+            started = time.monotonic() - latency
+            if status_code is None or status_code == 429 or status_code >= 500:
+                self._decrease(started)
+                return
+
+            self.samples.append(latency)
+            if len(self.samples) < self.window:
+                return
+
+            self.samples.sort()
+            p95 = self.samples[int(len(self.samples) * 0.95) - 1]
+            self.samples = []
+
+            if self.baseline_p95 is None or p95 < self.baseline_p95:
+                self.baseline_p95 = p95
+            elif p95 > self.baseline_p95 * self.latency_tolerance:
+                self._decrease(started)
+                self.baseline_p95 *= 1.05
+                return
+            else:
+                self.baseline_p95 *= 1.05
+
+            if self.limit < self.maximum:
+                self.limit += 1
+                self.increases += 1
+                self.peak_limit = max(self.peak_limit, self.limit)
+                if self.loop is not None and not self.loop.is_closed():
+                    self.loop.call_soon_threadsafe(self._start_notify)
+
+    def _decrease(self, started):
+        """
+        Cut the limit, unless the request was sent before the last cut.
+
+        Requests already in flight at a cut were sent under the old limit, so
+        one burst of errors counts once, while the first error of a run (or
+        of a new burst) always cuts.
+
+        Args:
+            started: time.monotonic() when the request was sent
+        """
+        if started < self.last_decrease:
+            return
+        self.last_decrease = time.monotonic()
+        self.samples = []
+        new_limit = max(self.minimum, int(self.limit * self.decrease_factor))
+        if new_limit < self.limit:
+            self.limit = new_limit
+            self.decreases += 1
+
+
+async def async_get_agreements_page(org_id, page, controller):
     """
-    Build web URL for viewing agreement in Concord interface.
+    Asyncio version of get_agreements_page().
 
     Args:
         org_id: Organization ID
-        agreement_uuid: Agreement UUID
+        page: Page number (starts at 0)
+        controller: AdaptiveConcurrencyController limiting in-flight requests
 
     Returns:
-        Full web URL string
+        List of agreement dictionaries (empty past the last page)
     """
-    return f"https://secure.concordnow.com/#/organizations/{org_id}/agreements/{agreement_uuid}"
+    loop = asyncio.get_running_loop()
+    async with controller:
+        return await loop.run_in_executor(None, get_agreements_page, org_id, page)
 
 
-def process_agreement(org_id, agreement):
+async def async_iter_signed_agreement_pages(org_id, controller, prefetch=1):
     """
-    Process a single agreement to extract all timeline data.
+    Asyncio version of iter_signed_agreement_pages().
+
+    Args:
+        org_id: Organization ID
+        controller: AdaptiveConcurrencyController limiting in-flight requests
+        prefetch: Number of page requests kept in flight
+
+    Yields:
+        Non-empty lists of agreement dictionaries, in page order
+    """
+    pending = deque()
+    next_page = 0
+    try:
+        while True:
+            while len(pending) < prefetch:
+                pending.append(asyncio.ensure_future(
+                    async_get_agreements_page(org_id, next_page, controller)
+                ))
+                next_page += 1
+
+            items = await pending.popleft()
+            # Continue after a full page (might be more), an empty or short page is the last one
+            last_page = len(items) < AGREEMENTS_PAGE_SIZE
+            _run_metrics.record_listing_page(len(items), last_page)
+            if not items:
+                break
+
+            yield items
+
+            if last_page:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def async_get_agreement_activities(org_id, agreement_uid, controller):
+    """
+    Asyncio version of get_agreement_activities().
+
+    Fresh cached audit trails are returned without taking a request slot.
+
+    Args:
+        org_id: Organization ID
+        agreement_uid: Agreement UID
+        controller: AdaptiveConcurrencyController limiting in-flight requests
+
+    Returns:
+        Returns {"activities": [...]} response structure
+    """
+    loop = asyncio.get_running_loop()
+    validators = None
+    if _activity_cache is not None:
+        # SQLite lookups block, so they run on the executor like requests
+        cached, validators = await loop.run_in_executor(None, _activity_cache.get, org_id, agreement_uid)
+        if cached is not None:
+            _run_metrics.record_cache(get_activities_path(org_id, agreement_uid), "hit")
+            return cached
+
+    async with controller:
+        return await loop.run_in_executor(None, fetch_activities, org_id, agreement_uid, validators)
 
-    Orchestrates: fetch activities, extract creation/approval/signature dates,
-    construct URL, and build complete timeline dictionary.
+
+async def async_process_agreement(org_id, agreement, controller, max_participants=5, include_events=False):
+    """
+    Asyncio version of process_agreement().
 
     Args:
         org_id: Organization ID
         agreement: Agreement dictionary with uuid, title fields
+        controller: AdaptiveConcurrencyController limiting in-flight requests
+        max_participants: Approvers and signers to keep (None = all of them)
+        include_events: Add every approval and signature to the timeline (see build_timeline)
 
     Returns:
-        Dictionary with all timeline fields for CSV export:
-        - agreementId, agreementTitle, agreementLink
-        - creationDate, createdBy
-        - approver1-5, approvalDate1-5
-        - signer1-5, signatureDate1-5
-        - firstApprovalDate, lastApprovalDate (backward compatibility)
-        - firstSignatureDate, lastSignatureDate (backward compatibility)
-        - totalApprovals, totalSignatures
+        TimelineRecord for CSV export (see build_timeline)
     """
-    agreement_uuid = agreement.get("uuid")
     agreement_title = agreement.get("title", "")
 
     # Fetch audit trail activities
-    activities_response = get_agreement_activities(org_id, agreement_uuid)
+    with _run_metrics.stage("fetch"):
+        activities_response = await async_get_agreement_activities(org_id, agreement.get("uuid"), controller)
+
+    with _run_metrics.stage("extract"), profile_stage("extract"):
+        timeline = build_timeline(
+            org_id,
+            agreement,
+            activities_response,
+            max_approvers=max_participants,
+            max_signers=max_participants,
+            include_events=include_events
+        )
+
+    # Print warnings if approvals or signatures were truncated
+    if max_participants is not None:
+        total_approvals = timeline.total_approvals
+        total_signatures = timeline.total_signatures
+        if total_approvals > max_participants:
+            log_warning(
+                "truncated",
+                f"Agreement '{agreement_title[:50]}' has {total_approvals} approvals (showing first {max_participants})",
+                uuid=agreement.get("uuid"),
+                approvals=total_approvals
+            )
+        if total_signatures > max_participants:
+            log_warning(
+                "truncated",
+                f"Agreement '{agreement_title[:50]}' has {total_signatures} signatures (showing first {max_participants})",
+                uuid=agreement.get("uuid"),
+                signatures=total_signatures
+            )
+
+    return timeline
+
+
+async def async_run_export(organizations, handle, on_result, controller, deduplicator, page_prefetch=1):
+    """
+    Asyncio engine: list agreements and process them under the adaptive limit.
 
-    # Extract all timeline data
-    creation_date = extract_creation_date(activities_response)
-    created_by = extract_created_by(activities_response)
+    Organizations are listed one after another (with page prefetching);
+    agreements are scheduled as soon as their page arrives, and results are
+    passed to on_result in organization and listing order.
+
+    Args:
+        organizations: List of organization dictionaries
+        handle: Coroutine function (org, agreement) -> (org, agreement, timeline, source)
+        on_result: Callable receiving each result tuple, in order
+        controller: AdaptiveConcurrencyController limiting in-flight requests
+        deduplicator: AgreementDeduplicator applied before scheduling
+        page_prefetch: Listing page requests kept in flight per organization
+    """
+    # Bound the number of scheduled agreements, like iter_ordered_results()
+    window = controller.maximum * 2
+    pending = deque()
 
-    # Extract detailed approvals and signatures
-    detailed_approvals, total_approvals = extract_detailed_approvals(activities_response)
-    detailed_signatures, total_signatures = extract_detailed_signatures(activities_response)
+    async def drain(limit):
+        while len(pending) > limit:
+            on_result(await pending.popleft())
 
-    # Extract first/last dates for backward compatibility
-    first_approval, last_approval = extract_approval_dates(activities_response)
-    first_signature, last_signature = extract_signature_dates(activities_response)
+    try:
+        for org in organizations:
+            async for items in async_iter_signed_agreement_pages(org.get("id"), controller, page_prefetch):
+                for agreement in items:
+                    if deduplicator.is_duplicate(agreement):
+                        continue
+                    pending.append(asyncio.ensure_future(handle(org, agreement)))
+                    await drain(window)
 
-    # Print warnings if more than 5 approvals or signatures
-    if total_approvals > 5:
-        print(f"  WARNING: Agreement '{agreement_title[:50]}' has {total_approvals} approvals (showing first 5)")
-    if total_signatures > 5:
-        print(f"  WARNING: Agreement '{agreement_title[:50]}' has {total_signatures} signatures (showing first 5)")
+            pending.append(asyncio.ensure_future(handle(org, None)))
 
-    # Construct web URL
-    agreement_link = construct_agreement_url(org_id, agreement_uuid)
+        await drain(0)
+    finally:
+        for task in pending:
+            task.cancel()
 
-    # Build complete timeline dictionary with all new fields
-    result = {
-        "agreementId": agreement_uuid,
-        "agreementTitle": agreement_title,
-        "agreementLink": agreement_link,
-        "creationDate": creation_date,
-        "createdBy": created_by,
-    }
 
-    # Add approver details (up to 5)
-    for i in range(5):
-        if i < len(detailed_approvals):
-            result[f"approver{i+1}"] = detailed_approvals[i]["email"]
-            result[f"approvalDate{i+1}"] = detailed_approvals[i]["date"]
-        else:
-            result[f"approver{i+1}"] = ""
-            result[f"approvalDate{i+1}"] = ""
-
-    # Add signer details (up to 5)
-    for i in range(5):
-        if i < len(detailed_signatures):
-            result[f"signer{i+1}"] = detailed_signatures[i]["email"]
-            result[f"signatureDate{i+1}"] = detailed_signatures[i]["date"]
-        else:
-            result[f"signer{i+1}"] = ""
-            result[f"signatureDate{i+1}"] = ""
+def parse_max_participants(value):
+    """
+    Parse the --max-participants option.
 
-    # Add backward compatible fields
-    result["firstApprovalDate"] = first_approval
-    result["lastApprovalDate"] = last_approval
-    result["firstSignatureDate"] = first_signature
-    result["lastSignatureDate"] = last_signature
+    Args:
+        value: "auto" or a positive integer string
 
-    # Add totals
-    result["totalApprovals"] = total_approvals
-    result["totalSignatures"] = total_signatures
+    Returns:
+        Integer limit, or None for "auto"
+    """
+    if value == "auto":
+        return None
 
-    return result
+    try:
+        limit = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got '{value}'")
+    if limit < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return limit
 
 
-def write_csv(filename, agreement_timelines):
+def parse_shard(value):
     """
-    Write agreement timeline data to CSV file.
-
-    CSV columns (31 total):
-    - Agreement ID, Title, Link, Creation Date, Created By
-    - Approver 1-5, Approval Date 1-5 (10 columns)
-    - Signer 1-5, Signature Date 1-5 (10 columns)
-    - First Approval Date, Last Approval Date (backward compatibility)
-    - First Signature Date, Last Signature Date (backward compatibility)
-    - Total Approvals, Total Signatures
+    Parse the --shard option.
 
     Args:
-        filename: Output CSV filename
-        agreement_timelines: List of timeline dictionaries
-    """
-    # Define CSV headers (31 columns total - must match spec exactly)
-    headers = [
-        # Columns 1-5: Basics
-        "Agreement ID",
-        "Agreement Title",
-        "Agreement Link",
-        "Creation Date",
-        "Created By",
-        # Columns 6-15: Detailed approvals (5 approvers)
-        "Approver 1",
-        "Approval Date 1",
-        "Approver 2",
-        "Approval Date 2",
-        "Approver 3",
-        "Approval Date 3",
-        "Approver 4",
-        "Approval Date 4",
-        "Approver 5",
-        "Approval Date 5",
-        # Columns 16-25: Detailed signatures (5 signers)
-        "Signer 1",
-        "Signature Date 1",
-        "Signer 2",
-        "Signature Date 2",
-        "Signer 3",
-        "Signature Date 3",
-        "Signer 4",
-        "Signature Date 4",
-        "Signer 5",
-        "Signature Date 5",
-        # Columns 26-29: Backward compatibility
-        "First Approval Date",
-        "Last Approval Date",
-        "First Signature Date",
-        "Last Signature Date",
-        # Columns 30-31: Totals
-        "Total Approvals",
-        "Total Signatures"
-    ]
+        value: "i/N" string, e.g. "2/4" for the second of four shards
 
+    Returns:
+        Tuple of (shard number, shard count)
+    """
+    index, _, count = value.partition("/")
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-
-            # Write header row
-            writer.writerow(headers)
-
-            # Write data rows
-            for timeline in agreement_timelines:
-                row = [
-                    # Columns 1-5: Basics
-                    timeline.get("agreementId", ""),
-                    timeline.get("agreementTitle", ""),
-                    timeline.get("agreementLink", ""),
-                    timeline.get("creationDate", ""),
-                    timeline.get("createdBy", ""),
-                    # Columns 6-15: Detailed approvals
-                    timeline.get("approver1", ""),
-                    timeline.get("approvalDate1", ""),
-                    timeline.get("approver2", ""),
-                    timeline.get("approvalDate2", ""),
-                    timeline.get("approver3", ""),
-                    timeline.get("approvalDate3", ""),
-                    timeline.get("approver4", ""),
-                    timeline.get("approvalDate4", ""),
-                    timeline.get("approver5", ""),
-                    timeline.get("approvalDate5", ""),
-                    # Columns 16-25: Detailed signatures
-                    timeline.get("signer1", ""),
-                    timeline.get("signatureDate1", ""),
-                    timeline.get("signer2", ""),
-                    timeline.get("signatureDate2", ""),
-                    timeline.get("signer3", ""),
-                    timeline.get("signatureDate3", ""),
-                    timeline.get("signer4", ""),
-                    timeline.get("signatureDate4", ""),
-                    timeline.get("signer5", ""),
-                    timeline.get("signatureDate5", ""),
-                    # Columns 26-29: Backward compatibility
-                    timeline.get("firstApprovalDate", ""),
-                    timeline.get("lastApprovalDate", ""),
-                    timeline.get("firstSignatureDate", ""),
-                    timeline.get("lastSignatureDate", ""),
-                    # Columns 30-31: Totals
-                    timeline.get("totalApprovals", ""),
-                    timeline.get("totalSignatures", "")
-                ]
-                writer.writerow(row)
-
-        print(f"✓ CSV file written: {filename}")
+        shard_index = int(index)
+        shard_count = int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, e.g. 1/4, got '{value}'")
+    if shard_count < 1 or not 1 <= shard_index <= shard_count:
+        raise argparse.ArgumentTypeError(f"shard number must be between 1 and N, got '{value}'")
+    return shard_index, shard_count
 
-    except IOError as e:
-        print(f"ERROR: Failed to write CSV file: {e}")
-        sys.exit(1)
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+
+    Returns:
+        argparse.Namespace with the parsed options
+    """
+    parser = argparse.ArgumentParser(
+        description="Export signed agreements with approval and execution times to CSV."
+    )
+    parser.add_argument(
+        "--base-url",
+        default=BASE_URL,
+        help=f"Concord API base URL, e.g. a local mock server (default: {BASE_URL})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of agreements to process concurrently (default: 1, sequential)"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "asyncio"],
+        default="threads",
+        help="Execution engine: a fixed pool of --workers threads (default), or asyncio "
+             "with an adaptive request limit starting at --workers"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=64,
+        help="Upper bound for the adaptive request limit of the asyncio engine (default: 64)"
+    )
+    parser.add_argument(
+        "--page-prefetch",
+        type=int,
+        default=1,
+        help="Agreement listing pages requested concurrently per organization (default: 1)"
+    )
+    parser.add_argument(
+        "--org-workers",
+        type=int,
+        default=1,
+        help="Number of organizations listed concurrently (default: 1)"
+    )
+    parser.add_argument(
+        "--max-participants",
+        type=parse_max_participants,
+        default=5,
+        metavar="N|auto",
+        help="Approver and signer columns in the CSV (default: 5); 'auto' sizes them "
+             "to the agreement with the most approvals/signatures"
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Output format (default: csv). parquet and arrow need pyarrow, .zst needs zstandard"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=5,
+        help="Retries per request on 429, 5xx and network errors (default: 5, 0 = fail fast)"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="Maximum API requests per second across all workers (default: 0, unlimited)"
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="FILE",
+        help="SQLite file caching audit trails between runs (default: no cache)"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=7.0,
+        metavar="DAYS",
+        help="Revalidate cached audit trails older than this many days (default: 7, 0 = never)"
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=200000,
+        help="Evict least recently used audit trails above this many entries (default: 200000, 0 = unbounded)"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Revalidate every cached audit trail with the API (conditional requests) "
+             "instead of reusing fresh entries as-is"
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=10.0,
+        metavar="SECONDS",
+        help="Print a progress line (count, rate, ETA) every SECONDS (default: 10, 0 = off)"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print every agreement and every warning as it happens"
+    )
+    parser.add_argument(
+        "--log-file",
+        metavar="FILE",
+        help="Append structured JSON Lines events (agreements, progress, warnings) to FILE"
+    )
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        help="Write a JSON run report: per-endpoint latency, decoded bytes and status codes, and time per stage"
+    )
+    parser.add_argument(
+        "--prometheus",
+        metavar="FILE",
+        help="Write the run metrics in Prometheus text format (for node_exporter's textfile collector)"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="Profile JSON decoding, timeline extraction and output writing with cProfile, "
+             "writing DIR/<stage>.prof and printing the top hotspots"
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=20,
+        metavar="N",
+        help="Functions printed per profiled stage (default: 20)"
+    )
+    parser.add_argument(
+        "--cycle-times",
+        metavar="FILE",
+        help="Write p50/p90/p99 cycle times per organization and per creator to this CSV file"
+    )
+    parser.add_argument(
+        "--store",
+        metavar="FILE",
+        help="Also upsert timelines into this SQLite database, with every approval "
+             "and signature in an indexed events table (default: no store)"
+    )
+    parser.add_argument(
+        "--incremental",
+        metavar="STATE_FILE",
+        help="Only fetch audit trails for agreements that are new or changed status since "
+             "the run that wrote STATE_FILE, reusing other rows from its CSV"
+    )
+    parser.add_argument(
+        "--diff",
+        metavar="STATE_FILE",
+        help="Write only the rows inserted, updated or deleted since the run that wrote "
+             "STATE_FILE to a delta file with an operation column, instead of the full export"
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="With --diff, also write the full export file"
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="i/N",
+        help="Only fetch the agreements that hash into shard i of N, writing a part file "
+             "for --merge-shards (every shard lists all agreements)"
+    )
+    parser.add_argument(
+        "--merge-shards",
+        type=int,
+        metavar="N",
+        help="Combine the part files of a finished N-shard export into the output file "
+             "(no API calls)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help="File recording completed agreements while exporting "
+             "(default: signed_agreements_execution_time.checkpoint, or one per --shard; removed on success)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip agreements already recorded in the checkpoint file by an interrupted run"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_concurrency < args.workers:
+        parser.error("--max-concurrency cannot be lower than --workers")
+    if args.engine == "asyncio" and args.org_workers > 1:
+        parser.error("--org-workers is not supported by the asyncio engine")
+    if args.incremental and args.format in ("parquet", "arrow"):
+        parser.error("--incremental requires a CSV or JSON Lines --format")
+    if args.page_prefetch < 1:
+        parser.error("--page-prefetch must be at least 1")
+    if args.org_workers < 1:
+        parser.error("--org-workers must be at least 1")
+    if args.max_retries < 0:
+        parser.error("--max-retries cannot be negative")
+    if args.rate_limit < 0:
+        parser.error("--rate-limit cannot be negative")
+    if args.cache_ttl < 0:
+        parser.error("--cache-ttl cannot be negative")
+    if args.cache_max_entries < 0:
+        parser.error("--cache-max-entries cannot be negative")
+    if args.progress_interval < 0:
+        parser.error("--progress-interval cannot be negative")
+    if args.profile_top < 1:
+        parser.error("--profile-top must be at least 1")
+    if args.merge_shards is not None and args.merge_shards < 1:
+        parser.error("--merge-shards must be at least 1")
+    if args.shard and args.merge_shards is not None:
+        parser.error("--shard and --merge-shards cannot be combined")
+    if args.shard and args.incremental:
+        parser.error("--incremental is not supported with --shard")
+    if args.snapshot and not args.diff:
+        parser.error("--snapshot requires --diff")
+    if args.diff and args.shard:
+        parser.error("--diff is not supported with --shard")
+    if args.diff and args.max_participants is None:
+        parser.error("--diff requires a fixed --max-participants")
+    if args.diff and args.incremental and not args.snapshot:
+        parser.error("--incremental with --diff requires --snapshot (rows are reused from the full export)")
+
+    if args.checkpoint is None:
+        if args.shard:
+            args.checkpoint = get_shard_filenames(*args.shard)[2]
+        else:
+            args.checkpoint = "signed_agreements_execution_time.checkpoint"
+
+    return args
 
 
 def main():
@@ -658,11 +4929,112 @@ def main():
     Orchestrates:
     1. Validate API key
     2. Get organizations
-    3. Fetch signed agreements (with pagination)
-    4. Process each agreement sequentially (extract timeline data)
-    5. Write CSV output
+    3. Fetch signed agreements (with pagination, optionally prefetching pages
+       and listing several organizations at once)
+    4. Process each agreement as its listing page arrives (sequentially, or
+       with --workers N concurrently)
+    5. Stream each row to the CSV output as it completes
     6. Display success summary
     """
+    args = parse_args()
+    run_started = time.time()
+    check_output_format(args.format)
+    if args.merge_shards:
+        merge_shard_outputs(args.merge_shards, args.format, args.cycle_times)
+        return
+
+    # Counters of the run reports, set up first so that a run failing early
+    # (API key, organizations listing) still writes its report at exit
+    summary = ExportSummary()
+    deduplicator = AgreementDeduplicator()
+    reused_count = 0
+    resumed_count = 0
+    output_writer = None
+    controller = None
+    reports_written = False
+
+    def write_run_reports(completed):
+        # JSON run report (--report) and Prometheus textfile (--prometheus), written once
+        nonlocal reports_written
+        if reports_written or not (args.report or args.prometheus):
+            return
+        reports_written = True
+        finished = time.time()
+
+        if args.report:
+            report = {
+                "startedAt": unix_ms_to_iso_string(int(run_started * 1000)),
+                "finishedAt": unix_ms_to_iso_string(int(finished * 1000)),
+                "durationSeconds": round(finished - run_started, 3),
+                "completed": completed,
+                "options": vars(args),
+                "agreements": {
+                    "exported": summary.total,
+                    "withApprovals": summary.with_approvals,
+                    "withSignatures": summary.with_signatures,
+                    "duplicatesSkipped": deduplicator.duplicates,
+                    "reused": reused_count,
+                    "resumed": resumed_count,
+                    "fetched": summary.total - reused_count - resumed_count,
+                },
+                "http": get_http_stats(),
+                "endpoints": _run_metrics.endpoint_report(),
+                "stages": _run_metrics.stage_report(),
+            }
+            if args.diff and output_writer is not None:
+                report["changes"] = output_writer.counts
+            if controller is not None:
+                report["adaptiveConcurrency"] = {
+                    "finalLimit": controller.limit,
+                    "peakLimit": controller.peak_limit,
+                    "increases": controller.increases,
+                    "decreases": controller.decreases,
+                }
+            if _activity_cache is not None:
+                report["cache"] = {
+                    "endpoints": _run_metrics.cache_report(),
+                    "evictions": _activity_cache.evictions,
+                }
+            write_file_atomically(args.report, json.dumps(report, indent=2) + "\n", "run report")
+            print(f"✓ Run report written: {args.report}")
+
+        if args.prometheus:
+            run_info = {
+                "completed": completed,
+                "duration_seconds": finished - run_started,
+                "finished_at": finished,
+                "agreements": summary.total,
+            }
+            write_file_atomically(args.prometheus, format_prometheus_metrics(_run_metrics, run_info), "Prometheus metrics")
+            print(f"✓ Prometheus metrics written: {args.prometheus}")
+
+    def write_failed_run_reports():
+        # Runs at exit: a failed export (sys.exit in get(), Ctrl-C) still leaves its report
+        try:
+            write_run_reports(completed=False)
+        except SystemExit:
+            pass
+
+    atexit.register(write_failed_run_reports)
+
+    configure_api(api_key=os.environ.get("CONCORD_API_KEY"), base_url=args.base_url)
+    if args.engine == "asyncio":
+        configure_session(pool_size=args.max_concurrency)
+    else:
+        configure_session(pool_size=args.workers + args.org_workers * args.page_prefetch)
+    configure_retries(max_retries=args.max_retries, rate_limit=args.rate_limit)
+    if args.profile:
+        configure_profiler()
+    configure_run_log(args.log_file, echo_warnings=args.verbose)
+    log_event("run_started", options=vars(args))
+    if args.cache:
+        configure_activity_cache(
+            args.cache,
+            ttl_days=args.cache_ttl,
+            max_entries=args.cache_max_entries,
+            refresh=args.refresh
+        )
+
     print("Export Signed Agreements - Approval & Execution Time")
     print("=" * 54)
     print()
@@ -681,66 +5053,324 @@ def main():
 
     print()
 
-    # Collect all agreement timelines
-    all_timelines = []
-
-    # Process each organization
-    for org in organizations:
-        org_id = org.get("id")
-        org_name = org.get("name", "Unknown")
-
-        print(f"Processing organization: {org_name}")
-
-        # Fetch signed agreements for this organization
-        agreements = get_signed_agreements(org_id)
-
-        if not agreements:
-            print(f"  No signed agreements found for {org_name}")
-            continue
-
-        print(f"✓ Found {len(agreements)} signed agreement(s)")
+    # Rows of the previous export that can be reused (--incremental)
+    reusable_timelines = {}
+    agreement_statuses = {}
+    agreement_milliseconds = {}
+    if args.incremental:
+        state = load_incremental_state(args.incremental)
+        reusable_timelines = load_reusable_timelines(state)
+        if state:
+            print(f"Incremental mode: {len(reusable_timelines)} agreement(s) exported by the run of {state.get('lastRun', 'unknown')}")
+        else:
+            print(f"Incremental mode: no previous state in {args.incremental}, running a full export")
         print()
 
-        # Process each agreement sequentially
-        print(f"Processing agreements:")
-        for i, agreement in enumerate(agreements, 1):
-            agreement_title = agreement.get("title", "Untitled")
-            print(f"  [{i}/{len(agreements)}] {agreement_title[:50]}...")
+    # Completed agreements are checkpointed so an interrupted run can --resume
+    checkpoint = Checkpoint(args.checkpoint, resume=args.resume)
+    atexit.register(checkpoint.close)
+    if args.resume:
+        print(f"Resuming: {len(checkpoint.completed)} agreement(s) already completed in {args.checkpoint}")
+        print()
 
-            # Extract timeline data
-            timeline = process_agreement(org_id, agreement)
-            all_timelines.append(timeline)
+    if args.shard:
+        print(f"Shard {args.shard[0]}/{args.shard[1]}: fetching the agreements that hash into this shard")
+        print()
 
+    def in_other_shard(agreement):
+        return args.shard is not None and get_agreement_shard(agreement.get("uuid"), args.shard[1]) != args.shard[0]
+
+    def find_reusable(agreement):
+        # Returns (timeline, source) where source is "checkpoint" or "previous", or None
+        agreement_uuid = agreement.get("uuid")
+        if agreement_uuid in checkpoint.completed:
+            return checkpoint.completed[agreement_uuid], "checkpoint"
+
+        # Reuse the previous row unless the agreement is new or its status changed
+        previous = reusable_timelines.get(agreement_uuid)
+        if previous is not None and previous[0] == agreement.get("status"):
+            return previous[1], "previous"
+        return None
+
+    # Rows are streamed to the output file as agreements complete; a shard
+    # streams its rows to a part file for --merge-shards instead
+    if args.shard:
+        filename, shard_summary_file, _ = get_shard_filenames(*args.shard)
+        output_writer = ShardPartWriter(filename)
+    else:
+        filename = get_csv_filename(args.format)
+        output_writer = None
+        if not args.diff or args.snapshot:
+            output_writer = create_output_writer(filename, args.format, args.max_participants)
+    if args.diff:
+        # Only the rows that changed since the previous run go to the delta
+        # file; the full export is passed the rows too with --snapshot
+        delta_filename = get_delta_filename(args.format)
+        output_writer = ChangeDataCapture(
+            args.diff,
+            delta_filename,
+            args.format,
+            get_csv_columns(args.max_participants, args.max_participants),
+            snapshot_writer=output_writer
+        )
+        previous_state = output_writer.previous_state
+        if previous_state:
+            print(f"Diff mode: {len(output_writer.previous_hashes)} row(s) exported by the run of {previous_state.get('lastRun', 'unknown')}")
+        else:
+            print(f"Diff mode: no previous state in {args.diff}, every row is an insert")
         print()
+    atexit.register(output_writer.abort)
+    cycle_times = CycleTimeReport()
+
+    # Optional SQLite copy of the timelines, with every approval and signature (--store)
+    timeline_store = None
+    if args.store:
+        timeline_store = TimelineStore(args.store)
+        atexit.register(timeline_store.close)
+
+    progress = ProgressReporter(interval=args.progress_interval)
+    current_org = None
+    org_count = 0
+    # Position in the deduplicated listing, and a CRC-32 over its uuids so
+    # --merge-shards can check that every shard saw the same listing
+    listing_index = 0
+    listing_digest = 0
+
+    def record(org, agreement, timeline, source):
+        # Called with each result, in organization and listing order
+        nonlocal current_org, org_count, resumed_count, reused_count, listing_index, listing_digest
 
-    # Generate CSV output
-    if not all_timelines:
+        org_name = org.get("name", "Unknown")
+        if org is not current_org:
+            current_org = org
+            org_count = 0
+            print(f"Processing organization: {org_name}")
+
+        # End of this organization's listing
+        if agreement is None:
+            if org_count:
+                print(f"✓ Processed {org_count} signed agreement(s) for {org_name}")
+            else:
+                print(f"  No signed agreements found for {org_name}")
+            print()
+            log_event("organization", org_id=org.get("id"), name=org_name, agreements=org_count)
+            return
+
+        listing_index += 1
+        listing_digest = zlib.crc32((agreement.get("uuid") or "").encode("utf-8"), listing_digest)
+        if source == "other_shard":
+            progress.update(
+                listing_index,
+                _run_metrics.agreements_listed - deduplicator.duplicates,
+                _run_metrics.organizations_listed >= len(organizations)
+            )
+            return
+
+        org_count += 1
+        agreement_title = agreement.get("title", "Untitled")
+        if source == "checkpoint":
+            resumed_count += 1
+        elif source == "previous":
+            reused_count += 1
+        elif args.verbose:
+            print(f"  [{org_count}] {agreement_title[:50]}...")
+
+        with _run_metrics.stage("write"), profile_stage("write"):
+            if source is None:
+                checkpoint.record(agreement.get("uuid"), timeline)
+            if args.incremental:
+                agreement_statuses[agreement.get("uuid")] = agreement.get("status")
+                milliseconds = subsecond_timestamps(timeline)
+                if milliseconds:
+                    agreement_milliseconds[agreement.get("uuid")] = milliseconds
+            if args.shard:
+                output_writer.add(listing_index, org_name, timeline)
+            else:
+                output_writer.write(timeline)
+            summary.add(timeline)
+            cycle_times.add(org_name, timeline)
+            if timeline_store is not None:
+                timeline_store.write(org.get("id"), agreement, timeline)
+
+        log_event(
+            "agreement",
+            uuid=agreement.get("uuid"),
+            org_id=org.get("id"),
+            source=source or "fetched",
+            approvals=timeline.total_approvals,
+            signatures=timeline.total_signatures
+        )
+        # Listing runs ahead of processing; duplicates are only known once reached
+        progress.update(
+            listing_index,
+            _run_metrics.agreements_listed - deduplicator.duplicates,
+            _run_metrics.organizations_listed >= len(organizations)
+        )
+
+    if args.engine == "asyncio":
+        controller = AdaptiveConcurrencyController(initial=args.workers, maximum=args.max_concurrency)
+        add_response_observer(controller.observe)
+
+        async def handle_async(org, agreement):
+            # Listing markers (agreement is None) and other shards' agreements pass straight through
+            if agreement is None:
+                return org, None, None, None
+            if in_other_shard(agreement):
+                return org, agreement, None, "other_shard"
+            reusable = find_reusable(agreement)
+            if reusable is not None:
+                return (org, agreement) + reusable
+            timeline = await async_process_agreement(
+                org.get("id"), agreement, controller, args.max_participants, include_events=bool(args.store)
+            )
+            return org, agreement, timeline, None
+
+        async def run_async_engine():
+            # Request threads for get(); the controller decides how many are busy
+            loop = asyncio.get_running_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=args.max_concurrency))
+            await async_run_export(
+                organizations,
+                handle_async,
+                lambda result: record(*result),
+                controller,
+                deduplicator,
+                page_prefetch=args.page_prefetch
+            )
+
+        asyncio.run(run_async_engine())
+    else:
+        def handle(item):
+            # Listing markers (agreement is None) and other shards' agreements pass straight through
+            org, agreement = item
+            if agreement is None:
+                return org, None, None, None
+            if in_other_shard(agreement):
+                return org, agreement, None, "other_shard"
+            reusable = find_reusable(agreement)
+            if reusable is not None:
+                return (org, agreement) + reusable
+            timeline = process_agreement(
+                org.get("id"), agreement, args.max_participants, include_events=bool(args.store)
+            )
+            return org, agreement, timeline, None
+
+        # Agreements are handed to the workers as soon as their listing page arrives;
+        # results come back in organization and listing order
+        listed_agreements = deduplicator.filter(iter_organization_agreements(
+            organizations,
+            page_prefetch=args.page_prefetch,
+            org_workers=args.org_workers
+        ))
+        for result in iter_ordered_results(handle, listed_agreements, args.workers):
+            record(*result)
+
+    # Finish output file
+    written = output_writer.close()
+    if args.shard:
+        # The summary file marks this shard as finished for --merge-shards
+        shard_summary = {
+            "shard": args.shard[0],
+            "shards": args.shard[1],
+            "listed": listing_index,
+            "listingDigest": listing_digest,
+            "exported": summary.total,
+            "duplicatesSkipped": deduplicator.duplicates,
+            "maxParticipants": args.max_participants,
+            "http": get_http_stats(),
+            "finishedAt": unix_ms_to_iso_string(int(time.time() * 1000)),
+        }
+        write_file_atomically(shard_summary_file, json.dumps(shard_summary, indent=2) + "\n", "shard summary")
+        print(f"✓ Shard summary written: {shard_summary_file}")
+    if not written:
+        checkpoint.close(remove=True)
+        write_run_reports(completed=True)
         print("No agreements to export. Exiting.")
         sys.exit(0)
+    checkpoint.close(remove=True)
+    if timeline_store is not None:
+        timeline_store.close()
+        print(f"✓ Timeline store updated: {args.store}")
+    if args.cycle_times:
+        cycle_times.write_csv(args.cycle_times)
+    write_run_reports(completed=True)
 
-    print("Writing CSV output...")
-    filename = get_csv_filename()
-    write_csv(filename, all_timelines)
+    if args.incremental:
+        save_incremental_state(args.incremental, filename, agreement_statuses, agreement_milliseconds)
+
+    if progress.interval and time.monotonic() - progress.started >= progress.interval:
+        progress.report()
 
     # Summary statistics
     print()
     print("✓ Export complete!")
     print()
-    print(f"Output file: {filename}")
-    print(f"Total agreements exported: {len(all_timelines)}")
-
-    # Count agreements with/without approvals and signatures
-    with_approvals = sum(1 for t in all_timelines if t.get("firstApprovalDate"))
-    without_approvals = len(all_timelines) - with_approvals
-    with_signatures = sum(1 for t in all_timelines if t.get("firstSignatureDate"))
-    without_signatures = len(all_timelines) - with_signatures
-
-    print(f"Agreements with approvals: {with_approvals}")
-    print(f"Agreements without approvals: {without_approvals}")
-    print(f"Agreements with signatures: {with_signatures}")
-    print(f"Agreements without signatures: {without_signatures}")
+    if not args.diff or args.snapshot:
+        print(f"Output file: {filename}")
+    if args.diff:
+        print(f"Delta file: {delta_filename}")
+    if args.shard:
+        print(f"Shard {args.shard[0]}/{args.shard[1]}: {summary.total} of {listing_index} listed agreement(s); "
+              f"run --merge-shards {args.shard[1]} once every shard has finished")
+    print(f"Total agreements exported: {summary.total}")
+    print(f"Agreements with approvals: {summary.with_approvals}")
+    print(f"Agreements without approvals: {summary.without_approvals}")
+    print(f"Agreements with signatures: {summary.with_signatures}")
+    print(f"Agreements without signatures: {summary.without_signatures}")
+    print(f"Duplicate agreements skipped: {deduplicator.duplicates}")
+    for group_type, _, metric, count, p50, p90, p99 in cycle_times.rows():
+        if group_type != "overall":
+            break
+        print(f"Cycle time {metric.replace('_', ' ')}: p50 {p50}h, p90 {p90}h, p99 {p99}h ({count} agreements)")
+    if args.incremental:
+        print(f"Agreements reused from previous export: {reused_count}")
+        print(f"Agreements fetched: {summary.total - reused_count - resumed_count}")
+    if args.resume:
+        print(f"Agreements resumed from checkpoint: {resumed_count}")
+    if args.diff:
+        changes = output_writer.counts
+        print(f"Rows inserted: {changes['insert']}, updated: {changes['update']}, "
+              f"deleted: {changes['delete']}, unchanged: {changes['unchanged']}")
+
+    http_stats = get_http_stats()
+    print(f"HTTP requests sent: {http_stats['requests']}")
+    print(f"HTTP connections opened: {http_stats['connections']}")
+    print(f"HTTP retries: {http_stats['retries']}")
+    print(f"Rate limit waits: {http_stats['throttle_waits']}")
+    print(f"Time spent waiting: {http_stats['sleep_seconds']:.1f}s")
+    if controller is not None:
+        print(f"Adaptive concurrency: final limit {controller.limit}, peak {controller.peak_limit} "
+              f"({controller.increases} increase(s), {controller.decreases} decrease(s))")
+
+    if timeline_store is not None:
+        print(f"Agreements stored: {timeline_store.agreements_written} "
+              f"({timeline_store.events_written} approval/signature event(s))")
+
+    if _activity_cache is not None:
+        cache_labels = {"activities": "Audit trail cache", "agreements_page": "Listing page cache"}
+        for endpoint, outcomes in _run_metrics.cache_report().items():
+            print(f"{cache_labels.get(endpoint, endpoint)}: {outcomes['hit']} hit(s), "
+                  f"{outcomes['not_modified']} not modified (304), {outcomes['miss']} miss(es)")
+        if _activity_cache.evictions:
+            print(f"Audit trail cache evictions: {_activity_cache.evictions}")
+    if _run_log.warnings:
+        print()
+        _run_log.print_summary()
+    log_event(
+        "run_finished",
+        exported=summary.total,
+        duplicates=deduplicator.duplicates,
+        reused=reused_count,
+        resumed=resumed_count,
+        warnings={category: count for category, (count, _) in _run_log.warnings.items()}
+    )
     print()
-    print("You can now open the CSV file in Excel, Google Sheets, or any spreadsheet application.")
+    if args.format == "csv" and not args.shard:
+        print("You can now open the CSV file in Excel, Google Sheets, or any spreadsheet application.")
+
+    if _profiler is not None:
+        print()
+        _profiler.write(args.profile, top=args.profile_top)
 
 
 if __name__ == "__main__":
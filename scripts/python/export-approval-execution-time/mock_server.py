@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Mock Concord API server for offline testing and benchmarks
+
+Serves synthetic data for the endpoints used by index.py:
+- GET /api/rest/1/user/me/organizations
+- GET /api/rest/1/user/me/organizations/{org_id}/agreements (paginated listing)
+- GET /api/rest/1/organizations/{org_id}/agreements/{uid}/activities?type=AUDIT
+
+Data is generated deterministically from --seed, so every run (and every
+request for the same agreement) returns the same content. Listing pages and
+audit trails carry an ETag, and conditional requests (If-None-Match) get a
+304 Not Modified. Response latency and 429/5xx errors can be injected to
+reproduce production conditions, and --chunked sends bodies with
+Transfer-Encoding: chunked instead of a Content-Length, as API gateways
+often do for large responses.
+
+Usage:
+    python mock_server.py --port 8080 --orgs 2 --agreements 5000 --latency-ms 40
+    CONCORD_API_KEY=test python index.py --base-url http://127.0.0.1:8080
+"""
+
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+# Activities that are neither approvals nor signatures
+NOISE_ACTIVITIES = ["VIEW", "COMMENT", "DOCUMENT_UPDATE", "MEMBER_INVITE", "DOWNLOAD"]
+SIGNATURE_ACTIVITIES = ["NEGOTIATION_APPROVE", "AGREEMENT_SIGNATURE_FINALIZE"]
+SERVER_ERROR_CODES = [500, 502, 503, 504]
+
+# Earliest synthetic creation date (2024-01-01 UTC), in Unix milliseconds
+BASE_TIMESTAMP_MS = 1704067200000
+HOUR_MS = 3600 * 1000
+
+# Size of the chunks of a chunked response body
+CHUNK_BYTES = 16 * 1024
+
+
+def organization_name(org_id):
+    """Return the name of a synthetic organization."""
+    return f"Synthetic Org {org_id}"
+
+
+def agreement_uuid(org_id, index):
+    """Return the uuid of the index-th agreement of an organization."""
+    return f"mock-{org_id:04d}-{index:08d}"
+
+
+def synthetic_audit_trail(seed, agreement_uid, mean_activities):
+    """
+    Generate the audit trail of one agreement.
+
+    The first activity creates the agreement, followed by views and comments,
+    0-4 approvals (VALIDATION_ACCEPT) and 1-3 signatures spread over a few days.
+
+    Args:
+        seed: Server seed
+        agreement_uid: Agreement UID (the trail only depends on seed and uid)
+        mean_activities: Average number of activities per trail
+
+    Returns:
+        Response dict with "activities" key, in random order like the real API
+    """
+    rng = random.Random(f"{seed}:{agreement_uid}")
+    created_at = BASE_TIMESTAMP_MS + rng.randint(0, 365 * 24) * HOUR_MS + rng.randint(0, HOUR_MS)
+
+    def activity(name, timestamp):
+        email = f"user{rng.randint(1, 200)}@example.com"
+        return {"name": name, "createdAt": timestamp, "creator": {"actor": {"email": email}}}
+
+    activities = [activity("AGREEMENT_CREATE", created_at)]
+
+    approved_at = created_at
+    for _ in range(rng.choice([0, 1, 1, 2, 2, 3, 4])):
+        approved_at += int(rng.expovariate(1 / (6 * HOUR_MS)))
+        activities.append(activity("VALIDATION_ACCEPT", approved_at))
+
+    signed_at = approved_at
+    for _ in range(rng.randint(1, 3)):
+        signed_at += int(rng.expovariate(1 / (12 * HOUR_MS)))
+        activities.append(activity(rng.choice(SIGNATURE_ACTIVITIES), signed_at))
+
+    noise_count = max(0, rng.randint(1, 2 * mean_activities) - len(activities))
+    for _ in range(noise_count):
+        activities.append(activity(rng.choice(NOISE_ACTIVITIES), created_at + rng.randint(0, signed_at - created_at + HOUR_MS)))
+
+    rng.shuffle(activities)
+    return {"activities": activities}
+
+
+class MockConcordHandler(BaseHTTPRequestHandler):
+    """Request handler, configured through the attributes of its MockConcordServer."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle's algorithm the
+    # body would wait for the client's delayed ACK (~40 ms per response)
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        # One handler per TCP connection: counts how well clients reuse them
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        server = self.server
+        server.count("requests")
+
+        if not self.headers.get("X-API-KEY"):
+            self.send_json(401, {"error": "Missing X-API-KEY header"})
+            return
+
+        time.sleep(server.sample_latency())
+
+        error_roll = server.random()
+        if error_roll < server.rate_limit_errors:
+            server.count("rate_limited")
+            self.send_json(429, {"error": "Too many requests"}, {"Retry-After": str(server.retry_after)})
+            return
+        if error_roll < server.rate_limit_errors + server.server_errors:
+            server.count("server_errors")
+            self.send_json(server.choice(SERVER_ERROR_CODES), {"error": "Injected server error"})
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+
+        # /api/rest/1/user/me/organizations
+        if parts == ["api", "rest", "1", "user", "me", "organizations"]:
+            organizations = [
+                {"id": org_id, "name": organization_name(org_id)}
+                for org_id in range(1, server.orgs + 1)
+            ]
+            self.send_json(200, {"organizations": organizations})
+            return
+
+        # /api/rest/1/user/me/organizations/{org_id}/agreements
+        if len(parts) == 8 and parts[:6] == ["api", "rest", "1", "user", "me", "organizations"] and parts[7] == "agreements":
+            org_id = self.parse_org_id(parts[6])
+            if org_id is None:
+                return
+            try:
+                page = int(query.get("page", ["0"])[0])
+                page_size = int(query.get("numberOfItemsByPage", ["50"])[0])
+            except ValueError:
+                self.send_json(400, {"error": "Invalid pagination parameters"})
+                return
+
+            start = page * page_size
+            end = min(start + page_size, server.agreements)
+            items = [
+                {
+                    "uuid": agreement_uuid(org_id, index),
+                    "title": f"Synthetic Agreement {org_id}-{index}",
+                    "status": "CURRENT_CONTRACT",
+                    "organizationId": org_id,
+                }
+                for index in range(start, end)
+            ]
+            server.count("listing_pages")
+            self.send_cacheable_json({"items": items})
+            return
+
+        # /api/rest/1/organizations/{org_id}/agreements/{uid}/activities
+        if len(parts) == 8 and parts[:4] == ["api", "rest", "1", "organizations"] and parts[5] == "agreements" and parts[7] == "activities":
+            if self.parse_org_id(parts[4]) is None:
+                return
+            server.count("audit_trails")
+            self.send_cacheable_json(synthetic_audit_trail(server.seed, parts[6], server.activities))
+            return
+
+        self.send_json(404, {"error": f"Unknown endpoint: {url.path}"})
+
+    def parse_org_id(self, value):
+        """Return a valid organization ID, or send a 404 and return None."""
+        try:
+            org_id = int(value)
+        except ValueError:
+            org_id = 0
+        if not 1 <= org_id <= self.server.orgs:
+            self.send_json(404, {"error": f"Unknown organization: {value}"})
+            return None
+        return org_id
+
+    def send_cacheable_json(self, data):
+        """Send a 200 with an ETag, or a 304 if the client's If-None-Match matches it."""
+        body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        etag = f'"{zlib.crc32(body):08x}-{len(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_json(200, data, {"ETag": etag}, body=body)
+
+    def send_json(self, status, data, headers=None, body=None):
+        if body is None:
+            body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if self.server.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        if not self.server.chunked:
+            self.wfile.write(body)
+            return
+        for start in range(0, len(body), CHUNK_BYTES):
+            chunk = body[start:start + CHUNK_BYTES]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class MockConcordServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the synthetic data settings and request counters.
+
+    Args:
+        address: (host, port) tuple (port 0 picks a free port)
+        orgs: Number of organizations
+        agreements: Signed agreements per organization
+        activities: Average activities per audit trail
+        latency_ms: Median response latency in milliseconds
+        latency_sigma: Spread of the log-normal latency distribution (0 = constant)
+        rate_limit_errors: Share of requests answered with 429
+        server_errors: Share of requests answered with 500/502/503/504
+        retry_after: Retry-After header of 429 responses, in seconds
+        chunked: Send response bodies with Transfer-Encoding: chunked
+        seed: Seed of the synthetic data and of the injected latency and errors
+        verbose: Log every request
+    """
+
+    daemon_threads = True
+    # Accept bursts of connections from highly concurrent clients
+    request_queue_size = 256
+
+    def __init__(self, address, orgs=2, agreements=1000, activities=20, latency_ms=0.0,
+                 latency_sigma=0.0, rate_limit_errors=0.0, server_errors=0.0,
+                 retry_after=0, chunked=False, seed=1, verbose=False):
+        super().__init__(address, MockConcordHandler)
+        self.orgs = orgs
+        self.agreements = agreements
+        self.activities = activities
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.rate_limit_errors = rate_limit_errors
+        self.server_errors = server_errors
+        self.retry_after = retry_after
+        self.chunked = chunked
+        self.seed = seed
+        self.verbose = verbose
+
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.reset_stats()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        """Reset the request counters."""
+        with self.lock:
+            self.stats = {"requests": 0, "connections": 0, "listing_pages": 0, "audit_trails": 0,
+                          "not_modified": 0, "rate_limited": 0, "server_errors": 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def random(self):
+        with self.lock:
+            return self.rng.random()
+
+    def choice(self, values):
+        with self.lock:
+            return self.rng.choice(values)
+
+    def sample_latency(self):
+        """Return a response delay in seconds (log-normal around latency_ms)."""
+        if self.latency_ms <= 0:
+            return 0.0
+        with self.lock:
+            return self.latency_ms * self.rng.lognormvariate(0, self.latency_sigma) / 1000
+
+
+def start_server(host="127.0.0.1", port=0, **settings):
+    """
+    Start a MockConcordServer on a background thread.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on (0 picks a free port)
+        **settings: MockConcordServer settings
+
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    server = MockConcordServer((host, port), **settings)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+
+    Returns:
+        argparse.Namespace with the parsed options
+    """
+    parser = argparse.ArgumentParser(description="Mock Concord API server with synthetic agreements.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--orgs", type=int, default=2, help="Number of organizations (default: 2)")
+    parser.add_argument("--agreements", type=int, default=1000, help="Signed agreements per organization (default: 1000)")
+    parser.add_argument("--activities", type=int, default=20, help="Average activities per audit trail (default: 20)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Median response latency in ms (default: 0)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5,
+                        help="Spread of the log-normal latency distribution, 0 = constant (default: 0.5)")
+    parser.add_argument("--rate-limit-errors", type=float, default=0.0,
+                        help="Share of requests answered with 429 Too Many Requests (default: 0)")
+    parser.add_argument("--server-errors", type=float, default=0.0,
+                        help="Share of requests answered with a 5xx error (default: 0)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After of 429 responses in seconds (default: 1)")
+    parser.add_argument("--chunked", action="store_true",
+                        help="Send response bodies with Transfer-Encoding: chunked instead of a Content-Length")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    args = parser.parse_args(argv)
+
+    if args.orgs < 0 or args.agreements < 0 or args.activities < 1:
+        parser.error("--orgs and --agreements cannot be negative, --activities must be at least 1")
+    if not 0 <= args.rate_limit_errors + args.server_errors <= 1:
+        parser.error("--rate-limit-errors and --server-errors must add up to between 0 and 1")
+
+    return args
+
+
+def main():
+    args = parse_args()
+    server = MockConcordServer(
+        (args.host, args.port),
+        orgs=args.orgs,
+        agreements=args.agreements,
+        activities=args.activities,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        rate_limit_errors=args.rate_limit_errors,
+        server_errors=args.server_errors,
+        retry_after=args.retry_after,
+        chunked=args.chunked,
+        seed=args.seed,
+        verbose=args.verbose
+    )
+
+    print(f"Mock Concord API listening on {server.base_url}")
+    print(f"{args.orgs} organization(s) x {args.agreements} signed agreement(s), ~{args.activities} activities each")
+    print("Press Ctrl-C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+        print(f"Requests served: {server.stats['requests']} ({server.stats['not_modified']} not modified)")
+
+
+if __name__ == "__main__":
+    main()